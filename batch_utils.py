@@ -0,0 +1,55 @@
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+
+
+def run_bounded(pool, func, jobs, max_pending, on_error):
+    # Jalankan func(*args) untuk tiap args di jobs pada executor pool. Jumlah
+    # tugas yang menunggu dibatasi max_pending agar input besar tidak dimuat
+    # sekaligus; hasil di-yield segera setelah selesai (urutan selesai).
+    # Jika tugas melempar exception, hasilnya diganti on_error(args, e).
+    jobs = iter(jobs)
+    pending = {}
+    exhausted = False
+    while pending or not exhausted:
+        while not exhausted and len(pending) < max_pending:
+            args = next(jobs, None)
+            if args is None:
+                exhausted = True
+                break
+            pending[pool.submit(func, *args)] = args
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            args = pending.pop(future)
+            try:
+                yield future.result()
+            except Exception as e:
+                yield on_error(args, e)
+
+
+class Throughput:
+    # Penghitung laju batch (item/s dan MB/s) untuk output CLI
+    def __init__(self, unit='file'):
+        self.unit = unit
+        self.total = 0
+        self.failed = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+    
+    def add(self, size, success=True):
+        self.total += 1
+        self.bytes += size
+        if not success:
+            self.failed += 1
+    
+    def rate(self):
+        elapsed = time.perf_counter() - self.start
+        rate = self.total / elapsed if elapsed > 0 else 0.0
+        mb_rate = self.bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+        return f"{rate:.2f} {self.unit}/s, {mb_rate:.2f} MB/s"
+    
+    def summary(self, detail=''):
+        elapsed = time.perf_counter() - self.start
+        return (f"Selesai: {self.total - self.failed}/{self.total} berhasil{detail} dalam {elapsed:.2f}s "
+                f"({self.rate()})")
@@ -0,0 +1,75 @@
+import argparse
+import getpass
+import os
+import sys
+import time
+
+from batch_utils import Throughput
+from crypto_file import TripleDESFileEncryption, FileEncryptionSession
+
+
+def find_legacy_files(paths, suffix='.encrypted'):
+    # File langsung dipakai apa adanya, direktori ditelusuri untuk *.encrypted
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(suffix):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def convert_files(paths, password, algorithm=None, chunk_size=1024 * 1024):
+    # Konversi satu per satu (memori dibatasi ukuran chunk); PBKDF2 untuk
+    # file baru hanya sekali lewat FileEncryptionSession
+    session = FileEncryptionSession(password, TripleDESFileEncryption(chunk_size=chunk_size))
+    for path in paths:
+        start = time.perf_counter()
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        if os.path.exists(path) and session.encryption._is_binary_container(path):
+            yield {'path': path, 'success': True, 'skipped': True, 'message': "Sudah format biner, dilewati.",
+                   'bytes': 0, 'seconds': 0.0}
+            continue
+        success, msg, _ = session.convert_legacy_file(path, algorithm=algorithm)
+        yield {
+            'path': path,
+            'success': success,
+            'skipped': False,
+            'message': msg,
+            'bytes': size,
+            'seconds': time.perf_counter() - start
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Konversi file .encrypted format JSON lama ke container biner (di tempat)."
+    )
+    parser.add_argument('paths', nargs='+', help="File atau direktori berisi file .encrypted")
+    parser.add_argument('-p', '--password', default=None, help="Password (default: ditanyakan)")
+    parser.add_argument('-a', '--algorithm', default=None, help="Algoritma file baru (default: 3DES-192)")
+    args = parser.parse_args(argv)
+
+    password = args.password or getpass.getpass("Password: ")
+
+    stats = Throughput('file')
+    for result in convert_files(find_legacy_files(args.paths), password, args.algorithm):
+        stats.add(result['bytes'], result['success'])
+        if result['skipped']:
+            status = "LEWAT"
+        elif result['success']:
+            status = "OK"
+        else:
+            status = "GAGAL"
+        print(f"[{status}] {result['path']}: {result['message']} ({result['seconds']:.2f}s)", flush=True)
+
+    print(stats.summary())
+    return 1 if stats.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from crypto_file import TripleDESFileEncryption, OperationCancelled
+from crypto_text import SuperEncryption
+
+
+class AsyncCryptoService:
+    # Versi asyncio untuk enkripsi file dan teks. Kerja CPU (PBKDF2, cipher)
+    # dan I/O file dijalankan di thread pool terbatas sehingga event loop
+    # tidak terblokir. File besar memakai jalur terpisah dengan slot lebih
+    # sedikit agar permintaan kecil tidak ikut mengantre di belakangnya.
+    def __init__(self, max_workers=None, large_file_slots=None,
+                 large_file_threshold=16 * 1024 * 1024, file_encryption=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Default: separuh slot untuk file besar, sisanya selalu tersedia untuk yang kecil
+        self.large_file_slots = large_file_slots or max(1, self.max_workers // 2)
+        self.large_file_threshold = large_file_threshold
+        self.file_encryption = file_encryption or TripleDESFileEncryption()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._large_slots = asyncio.Semaphore(self.large_file_slots)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run(self, func, *args, **kwargs):
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+    
+    async def _run_file(self, size, func, *args, progress=None, **kwargs):
+        # Pembatalan task: thread worker dihentikan lewat callback progress
+        # di batas chunk berikutnya, lalu slot dilepas setelah thread selesai
+        cancelled = threading.Event()
+        loop = asyncio.get_running_loop()
+
+        def report(done, total):
+            if cancelled.is_set():
+                raise OperationCancelled("Operasi dibatalkan.")
+            if progress is not None:
+                loop.call_soon_threadsafe(progress, done, total)
+
+        large = size >= self.large_file_threshold
+        if large:
+            await self._large_slots.acquire()
+        try:
+            async with self._slots:
+                future = loop.run_in_executor(
+                    self._executor, functools.partial(func, *args, progress=report, **kwargs)
+                )
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    await asyncio.gather(future, return_exceptions=True)
+                    raise
+        finally:
+            if large:
+                self._large_slots.release()
+    
+    def _file_size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+    
+    async def encrypt_file_async(self, input_path, password, output_path=None, segmented=False,
+                                 algorithm=None, compression=None, progress=None):
+        # progress(byte_selesai, total) dipanggil di event loop
+        return await self._run_file(
+            self._file_size(input_path), self.file_encryption.encrypt_file,
+            input_path, password, output_path, segmented, algorithm, compression, progress=progress
+        )
+    
+    async def decrypt_file_async(self, input_path, password, output_path=None, progress=None):
+        return await self._run_file(
+            self._file_size(input_path), self.file_encryption.decrypt_file,
+            input_path, password, output_path, progress=progress
+        )
+    
+    async def encrypt_text_async(self, plaintext, password, shift=3, mode='CBC'):
+        return await self._run(SuperEncryption(shift, mode).encrypt, plaintext, password)
+    
+    async def decrypt_text_async(self, ciphertext, password, shift=3):
+        return await self._run(SuperEncryption(shift).decrypt, ciphertext, password)
@@ -1,88 +1,894 @@
-from Crypto.Cipher import DES3
+from Crypto.Cipher import DES3, AES, ChaCha20_Poly1305
 from Crypto.Random import get_random_bytes
 from Crypto.Util.Padding import pad, unpad
-from Crypto.Protocol.KDF import PBKDF2
+from Crypto.Protocol.KDF import PBKDF2, HKDF
+from Crypto.Hash import SHA256
 import os
+import mmap
+import tempfile
+import zlib
+import lzma
+import bz2
 import json
 import base64
 import hashlib
+import hmac
+import struct
+from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Container biner: header tetap + ekstensi TLV, lalu ciphertext mentah
+FILE_MAGIC = b'CMCF'
+# Versi 2 hanya ditulis untuk file terkompresi agar pembaca lama menolaknya
+FILE_VERSION = 2
+# magic, versi, id algoritma, flags, id KDF, ukuran chunk, ukuran asli,
+# salt, IV/nonce (16 byte, dipakai sesuai backend), panjang ekstensi
+FILE_HEADER_FORMAT = '>4sBBBBIQ16s16sH'
+FILE_HEADER_SIZE = struct.calcsize(FILE_HEADER_FORMAT)
+EXT_FORMAT = '>BH'
+EXT_SIZE = struct.calcsize(EXT_FORMAT)
+EXT_FILENAME = 1
+EXT_SEGMENT_COUNT = 2
+EXT_MASTER_SALT = 3
+EXT_PLAIN_SIZE = 4
+
+# flags bit 0: mode segmented (tiap chunk dienkripsi mandiri dengan IV turunan)
+# flags bit 1: header diikuti HMAC header dan tiap chunk diikuti tag HMAC
+# flags bit 2-3: codec kompresi sebelum enkripsi; ukuran asli di header
+# menjadi ukuran data terkompresi, ukuran file asli di ekstensi EXT_PLAIN_SIZE
+FLAG_SEGMENTED = 0x01
+FLAG_AUTHENTICATED = 0x02
+FLAG_CODEC_SHIFT = 2
+FLAG_CODEC_MASK = 0x0C
+HEADER_MAC_SIZE = 32
+TAG_SIZE = 16
+
+# KDF_PBKDF2: kunci = PBKDF2(password, salt)
+# KDF_PBKDF2_HKDF: master = PBKDF2(password, master salt), kunci = HKDF(master, salt file)
+KDF_PBKDF2 = 1
+KDF_PBKDF2_HKDF = 2
+HKDF_CONTEXT = b'CamoCrypt file key'
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+CODEC_BZ2 = 3
+COMPRESSION_CODECS = {'zlib': CODEC_ZLIB, 'lzma': CODEC_LZMA, 'bz2': CODEC_BZ2}
+CODEC_NAMES = {codec: name for name, codec in COMPRESSION_CODECS.items()}
+# Sampel awal file untuk mendeteksi data yang tidak bisa dikompres
+COMPRESSION_SAMPLE = 64 * 1024
+
+
+class ChunkIntegrityError(ValueError):
+    # Tag HMAC chunk tidak cocok (file rusak/diubah pada chunk tertentu)
+    pass
+
+
+class OperationCancelled(Exception):
+    # Dilempar callback progress untuk menghentikan operasi di batas chunk
+    pass
+
+
+class _DecompressWriter:
+    # Pembungkus file output: data hasil dekripsi didekompresi sebelum ditulis
+    def __init__(self, dst, decompressor):
+        self.dst = dst
+        self.decompressor = decompressor
+        self.size = 0
+    
+    def write(self, data):
+        plain = self.decompressor.decompress(data)
+        self.size += len(plain)
+        self.dst.write(plain)
+    
+    def finish(self):
+        if hasattr(self.decompressor, 'flush'):
+            tail = self.decompressor.flush()
+            self.size += len(tail)
+            self.dst.write(tail)
+        if not self.decompressor.eof:
+            raise ValueError("Data terkompresi tidak lengkap.")
+
+
+class _LegacyJsonScanner:
+    # Pemindai JSON minimal untuk file .encrypted format lama: field kecil
+    # dibaca biasa, nilai 'ciphertext' hanya dicatat posisinya (awal, akhir)
+    def __init__(self, f, read_size=1024 * 1024):
+        self.f = f
+        self.read_size = read_size
+        self.buffer = b''
+        self.index = 0
+        self.offset = 0
+    
+    def _refill(self):
+        self.offset += len(self.buffer)
+        self.buffer = self.f.read(self.read_size)
+        self.index = 0
+        if not self.buffer:
+            raise ValueError("File JSON tidak lengkap.")
+    
+    def _next(self):
+        if self.index >= len(self.buffer):
+            self._refill()
+        byte = self.buffer[self.index]
+        self.index += 1
+        return byte
+    
+    def _next_token(self):
+        byte = self._next()
+        while byte in b' \t\r\n':
+            byte = self._next()
+        return byte
+    
+    def _read_string(self):
+        raw = bytearray(b'"')
+        escaped = False
+        while True:
+            byte = self._next()
+            raw.append(byte)
+            if escaped:
+                escaped = False
+            elif byte == ord('\\'):
+                escaped = True
+            elif byte == ord('"'):
+                return json.loads(raw.decode('utf-8'))
+    
+    def _skip_base64(self):
+        # Base64 tidak memiliki escape, cukup cari tanda kutip penutup
+        start = self.offset + self.index
+        while True:
+            end = self.buffer.find(b'"', self.index)
+            if b'\\' in self.buffer[self.index:end if end >= 0 else len(self.buffer)]:
+                raise ValueError("Ciphertext JSON tidak valid.")
+            if end >= 0:
+                self.index = end + 1
+                return start, self.offset + end
+            self.index = len(self.buffer)
+            self._refill()
+    
+    def scan(self):
+        fields = {}
+        span = None
+        if self._next_token() != ord('{'):
+            raise ValueError("Bukan file .encrypted format JSON.")
+        byte = self._next_token()
+        while byte != ord('}'):
+            if byte != ord('"'):
+                raise ValueError("File JSON tidak valid.")
+            key = self._read_string()
+            if self._next_token() != ord(':'):
+                raise ValueError("File JSON tidak valid.")
+            byte = self._next_token()
+            if byte == ord('"') and key == 'ciphertext':
+                span = self._skip_base64()
+                byte = self._next_token()
+            elif byte == ord('"'):
+                fields[key] = self._read_string()
+                byte = self._next_token()
+            else:
+                # Nilai skalar (angka, true/false/null) sampai pemisah berikutnya
+                raw = bytearray()
+                while byte not in b',}':
+                    raw.append(byte)
+                    byte = self._next()
+                fields[key] = json.loads(raw.decode('utf-8'))
+            if byte == ord(','):
+                byte = self._next_token()
+            elif byte != ord('}'):
+                raise ValueError("File JSON tidak valid.")
+        if span is None:
+            raise ValueError("Field ciphertext tidak ditemukan.")
+        return fields, span
+
+
+class _LegacyPlainReader:
+    # Objek file baca: base64 -> 3DES-CBC -> plaintext secara bertahap.
+    # Blok plaintext terakhir ditahan sampai akhir untuk membuang padding.
+    def __init__(self, f, span, cipher, block_size=8, read_chars=1024 * 1024):
+        self.f = f
+        self.position, self.end = span
+        self.cipher = cipher
+        self.block_size = block_size
+        # Kelipatan 32 karakter base64 = kelipatan 24 byte (kelipatan blok)
+        self.read_chars = read_chars - read_chars % 32
+        self.buffer = bytearray()
+        self.held = b''
+        self.done = False
+    
+    def _fill(self):
+        self.f.seek(self.position)
+        count = min(self.read_chars, self.end - self.position)
+        chunk = self.f.read(count)
+        if len(chunk) < count:
+            raise ValueError("File JSON tidak lengkap.")
+        self.position += count
+        data = base64.b64decode(chunk)
+        if len(data) % self.block_size:
+            raise ValueError("Panjang ciphertext tidak valid.")
+        plain = self.held + self.cipher.decrypt(data)
+        self.buffer += plain[:-self.block_size]
+        self.held = plain[-self.block_size:]
+        if self.position >= self.end:
+            self.buffer += unpad(self.held, self.block_size)
+            self.done = True
+    
+    def read(self, size=-1):
+        while not self.done and (size < 0 or len(self.buffer) < size):
+            self._fill()
+        if size < 0:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+class _ChunkAuth:
+    # HMAC-SHA256 untuk header (sekaligus key-check value) dan tiap chunk.
+    # Tag chunk terikat ke header, indeks chunk dan penanda chunk terakhir.
+    def __init__(self, key, header):
+        self.mac_key = hmac.new(key, b'CamoCrypt MAC key', hashlib.sha256).digest()
+        self.header_mac = hmac.new(self.mac_key, header, hashlib.sha256).digest()
+    
+    def aad(self, index, final):
+        return self.header_mac + struct.pack('>QB', index, final)
+    
+    def tag(self, index, final, data):
+        mac = hmac.new(self.mac_key, self.aad(index, final), hashlib.sha256)
+        mac.update(data)
+        return mac.digest()[:TAG_SIZE]
+    
+    def verify(self, index, final, record):
+        # Kembalikan ciphertext jika tag cocok (slice tidak disimpan di variabel
+        # lokal agar traceback error tidak menahan view mmap)
+        if len(record) < TAG_SIZE or not hmac.compare_digest(
+                self.tag(index, final, record[:-TAG_SIZE]), bytes(record[-TAG_SIZE:])):
+            raise ChunkIntegrityError(f"File rusak pada chunk ke-{index + 1}.")
+        return record[:-TAG_SIZE]
+
+
+class CipherBackend:
+    # Antarmuka backend cipher file. Tiap segmen dienkripsi mandiri dengan
+    # IV/nonce turunan dari nonce dasar di header + indeks segmen.
+    name = None
+    algorithm_id = None
+    key_size = None
+    nonce_size = None
+    block_size = 1
+    
+    def encrypt_segment(self, key, nonce, index, data, final, auth):
+        raise NotImplementedError
+    
+    def decrypt_segment(self, key, nonce, index, record, final, auth):
+        raise NotImplementedError
+    
+    def cipher_size(self, length, final):
+        # Panjang ciphertext (tanpa tag) untuk plaintext sepanjang length
+        raise NotImplementedError
+    
+    # Varian *_into menulis hasil langsung ke buffer out (memoryview)
+    def encrypt_segment_into(self, key, nonce, index, data, final, auth, out):
+        raise NotImplementedError
+    
+    def decrypt_segment_into(self, key, nonce, index, record, final, auth, out):
+        raise NotImplementedError
+
+
+class TripleDESBackend(CipherBackend):
+    # 3DES-CBC dengan padding pada segmen terakhir dan tag HMAC per chunk
+    name = "3DES-192"
+    algorithm_id = 1
+    key_size = 24
+    nonce_size = 8
+    block_size = 8
+    
+    def new_cipher(self, key, iv):
+        return DES3.new(key, DES3.MODE_CBC, iv=iv)
+    
+    def _segment_iv(self, key, iv, index):
+        # IV per segmen diturunkan dari kunci + IV dasar + indeks segmen
+        return hmac.new(key, iv + struct.pack('>Q', index), hashlib.sha256).digest()[:self.block_size]
+    
+    def encrypt_segment(self, key, iv, index, data, final, auth):
+        cipher = self.new_cipher(key, self._segment_iv(key, iv, index))
+        ciphertext = cipher.encrypt(pad(data, self.block_size) if final else data)
+        return ciphertext + auth.tag(index, final, ciphertext)
+    
+    def decrypt_segment(self, key, iv, index, record, final, auth):
+        data = auth.verify(index, final, record)
+        if len(data) % self.block_size:
+            raise ValueError("Panjang ciphertext tidak valid.")
+        plain = self.new_cipher(key, self._segment_iv(key, iv, index)).decrypt(data)
+        return unpad(plain, self.block_size) if final else plain
+    
+    def cipher_size(self, length, final):
+        return (length // self.block_size + 1) * self.block_size if final else length
+    
+    def seal_into(self, cipher, index, data, final, auth, out):
+        # Enkripsi satu chunk dengan cipher yang sudah disiapkan (segmen atau chain CBC)
+        if final:
+            data = pad(bytes(data), self.block_size)
+        size = len(data)
+        cipher.encrypt(data, output=out[:size])
+        out[size:] = auth.tag(index, final, out[:size])
+    
+    def open_into(self, cipher, index, record, final, auth, out):
+        data = auth.verify(index, final, record)
+        try:
+            if len(data) % self.block_size or len(data) != self.cipher_size(len(out), final):
+                raise ValueError("Panjang ciphertext tidak valid.")
+            if final:
+                out[:] = unpad(cipher.decrypt(data), self.block_size)
+            else:
+                cipher.decrypt(data, output=out)
+        finally:
+            data.release()
+    
+    def encrypt_segment_into(self, key, iv, index, data, final, auth, out):
+        self.seal_into(self.new_cipher(key, self._segment_iv(key, iv, index)), index, data, final, auth, out)
+    
+    def decrypt_segment_into(self, key, iv, index, record, final, auth, out):
+        self.open_into(self.new_cipher(key, self._segment_iv(key, iv, index)), index, record, final, auth, out)
+
+
+class _AEADBackend(CipherBackend):
+    # Cipher AEAD: tag bawaan cipher menggantikan tag HMAC, AAD mengikat
+    # chunk ke HMAC header, indeks chunk dan penanda chunk terakhir
+    key_size = 32
+    nonce_size = 12
+    
+    def new_cipher(self, key, nonce):
+        raise NotImplementedError
+    
+    def _segment_nonce(self, nonce, index):
+        # 4 byte awal tetap, 8 byte akhir di-XOR dengan indeks segmen
+        counter = int.from_bytes(nonce[4:], 'big') ^ index
+        return nonce[:4] + counter.to_bytes(8, 'big')
+    
+    def encrypt_segment(self, key, nonce, index, data, final, auth):
+        cipher = self.new_cipher(key, self._segment_nonce(nonce, index))
+        cipher.update(auth.aad(index, final))
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return ciphertext + tag
+    
+    def decrypt_segment(self, key, nonce, index, record, final, auth):
+        if len(record) < TAG_SIZE:
+            raise ChunkIntegrityError(f"File rusak pada chunk ke-{index + 1}.")
+        cipher = self.new_cipher(key, self._segment_nonce(nonce, index))
+        cipher.update(auth.aad(index, final))
+        try:
+            return cipher.decrypt_and_verify(record[:-TAG_SIZE], record[-TAG_SIZE:])
+        except ValueError:
+            raise ChunkIntegrityError(f"File rusak pada chunk ke-{index + 1}.")
+    
+    def cipher_size(self, length, final):
+        return length
+    
+    def encrypt_segment_into(self, key, nonce, index, data, final, auth, out):
+        cipher = self.new_cipher(key, self._segment_nonce(nonce, index))
+        cipher.update(auth.aad(index, final))
+        size = len(data)
+        cipher.encrypt(data, output=out[:size])
+        out[size:] = cipher.digest()
+    
+    def decrypt_segment_into(self, key, nonce, index, record, final, auth, out):
+        if len(record) != len(out) + TAG_SIZE:
+            raise ChunkIntegrityError(f"File rusak pada chunk ke-{index + 1}.")
+        cipher = self.new_cipher(key, self._segment_nonce(nonce, index))
+        cipher.update(auth.aad(index, final))
+        # Plaintext sudah tertulis ke out sebelum tag dicek; pemanggil
+        # menghapus file output bila verifikasi gagal
+        cipher.decrypt(record[:-TAG_SIZE], output=out)
+        try:
+            cipher.verify(bytes(record[-TAG_SIZE:]))
+        except ValueError:
+            raise ChunkIntegrityError(f"File rusak pada chunk ke-{index + 1}.")
+
+
+class AESGCMBackend(_AEADBackend):
+    name = "AES-256-GCM"
+    algorithm_id = 2
+    
+    def new_cipher(self, key, nonce):
+        return AES.new(key, AES.MODE_GCM, nonce=nonce, mac_len=TAG_SIZE)
+
+
+class ChaCha20Poly1305Backend(_AEADBackend):
+    name = "ChaCha20-Poly1305"
+    algorithm_id = 3
+    
+    def new_cipher(self, key, nonce):
+        return ChaCha20_Poly1305.new(key=key, nonce=nonce)
+
+
+CIPHER_BACKENDS = {
+    backend.name: backend
+    for backend in (TripleDESBackend(), AESGCMBackend(), ChaCha20Poly1305Backend())
+}
+ALGORITHM_IDS = {name: backend.algorithm_id for name, backend in CIPHER_BACKENDS.items()}
+_BACKENDS_BY_ID = {backend.algorithm_id: backend for backend in CIPHER_BACKENDS.values()}
+
+
+class _PasswordKeys:
+    # Sumber kunci file dari satu password. Dengan use_master=True, PBKDF2
+    # hanya dijalankan sekali per master salt lalu tiap file memakai HKDF.
+    def __init__(self, password, use_master=False, master_salt=None):
+        self.password = password
+        self._master_keys = {}
+        self._lock = threading.Lock()
+        self.master_salt = None
+        if use_master:
+            self.master_salt = master_salt or get_random_bytes(16)
+            self._master_key(self.master_salt)
+    
+    def _master_key(self, master_salt):
+        with self._lock:
+            if master_salt not in self._master_keys:
+                self._master_keys[master_salt] = PBKDF2(self.password, master_salt, dkLen=32, count=100000)
+            return self._master_keys[master_salt]
+    
+    def _subkey(self, master_salt, salt, key_size):
+        return HKDF(self._master_key(master_salt), key_size, salt, SHA256, context=HKDF_CONTEXT)
+    
+    def master_subkey(self, context, key_size=32):
+        # Kunci tambahan (mis. manifest) dari master key, terpisah dari kunci file
+        return HKDF(self._master_key(self.master_salt), key_size, self.master_salt, SHA256, context=context)
+    
+    def new_file_key(self, key_size):
+        # Kembalikan (kunci, salt, id KDF, master salt) untuk file baru
+        salt = get_random_bytes(16)
+        if self.master_salt is None:
+            #menggunakan PBKDF2 untuk derive key sesuai ukuran kunci backend
+            return PBKDF2(self.password, salt, dkLen=key_size, count=100000), salt, KDF_PBKDF2, None
+        return self._subkey(self.master_salt, salt, key_size), salt, KDF_PBKDF2_HKDF, self.master_salt
+    
+    def key_for(self, header):
+        key_size = header['backend'].key_size
+        if header['kdf_id'] == KDF_PBKDF2_HKDF:
+            return self._subkey(header['master_salt'], header['salt'], key_size)
+        return PBKDF2(self.password, header['salt'], dkLen=key_size, count=100000)
 
 
 class TripleDESFileEncryption:
-    def __init__(self):
-        self.algorithm = "3DES-192"
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, algorithm="3DES-192",
+                 use_mmap=True):
+        # Algoritma default untuk enkripsi; dekripsi mengikuti id algoritma di header
+        self.algorithm = algorithm
         self.key_size = 24
         self.block_size = 8  
+        # Ukuran chunk (kelipatan block size) untuk enkripsi streaming
+        self.chunk_size = chunk_size
+        # Jumlah thread untuk mode segmented (default: jumlah CPU)
+        self.workers = workers or os.cpu_count() or 1
+        # File lokal di-mmap: ciphertext/plaintext ditulis langsung ke output
+        # yang sudah dialokasikan, tanpa salinan bytes per chunk
+        self.use_mmap = use_mmap
     
-    def _derive_key(self, password):
-        salt = get_random_bytes(16)
-        #menggunakan PBKDF2 untuk derive key 192-bit untuk 3DES
-        key = PBKDF2(password, salt, dkLen=24, count=100000)
-        return key, salt
+    def _build_header(self, salt, iv, original_size, original_filename, flags=0,
+                      kdf_id=KDF_PBKDF2, master_salt=None, algorithm=None, plain_size=None):
+        name = original_filename.encode('utf-8')
+        extensions = struct.pack(EXT_FORMAT, EXT_FILENAME, len(name)) + name
+        if master_salt is not None:
+            extensions += struct.pack(EXT_FORMAT, EXT_MASTER_SALT, len(master_salt)) + master_salt
+        if flags & FLAG_SEGMENTED:
+            # Indeks segmen: jumlah segmen (segmen terakhir selalu berisi padding)
+            count = struct.pack('>Q', self._segment_count(original_size, self.chunk_size))
+            extensions += struct.pack(EXT_FORMAT, EXT_SEGMENT_COUNT, len(count)) + count
+        if plain_size is not None:
+            size = struct.pack('>Q', plain_size)
+            extensions += struct.pack(EXT_FORMAT, EXT_PLAIN_SIZE, len(size)) + size
+        version = FILE_VERSION if flags & FLAG_CODEC_MASK else 1
+        header = struct.pack(
+            FILE_HEADER_FORMAT, FILE_MAGIC, version, ALGORITHM_IDS[algorithm or self.algorithm],
+            flags, kdf_id, self.chunk_size, original_size, salt, iv.ljust(16, b'\0'),
+            len(extensions)
+        )
+        return header + extensions
+    
+    def _read_header(self, f):
+        raw = f.read(FILE_HEADER_SIZE)
+        if len(raw) < FILE_HEADER_SIZE:
+            raise ValueError("Header file terenkripsi tidak lengkap.")
+        (magic, version, algorithm_id, flags, kdf_id, chunk_size, original_size,
+         salt, iv, ext_length) = struct.unpack(FILE_HEADER_FORMAT, raw)
+        if magic != FILE_MAGIC:
+            raise ValueError("Bukan file terenkripsi CamoCrypt.")
+        if version > FILE_VERSION:
+            raise ValueError(f"Versi format file ({version}) tidak didukung.")
+        backend = _BACKENDS_BY_ID.get(algorithm_id)
+        if backend is None or kdf_id not in (KDF_PBKDF2, KDF_PBKDF2_HKDF):
+            raise ValueError("Algoritma file tidak didukung.")
+        if not flags & FLAG_AUTHENTICATED:
+            # Container tanpa HMAC header/tag chunk tidak bisa diverifikasi, jadi ditolak
+            raise ValueError("File terenkripsi tanpa autentikasi tidak didukung.")
+        if not isinstance(backend, TripleDESBackend) and not flags & FLAG_SEGMENTED:
+            raise ValueError("Algoritma file tidak didukung.")
+        if chunk_size == 0 or chunk_size % backend.block_size:
+            raise ValueError("Ukuran chunk pada header tidak valid.")
+
+        extensions = f.read(ext_length)
+        header = {
+            'raw': raw + extensions,
+            'flags': flags,
+            'kdf_id': kdf_id,
+            'chunk_size': chunk_size,
+            'original_size': original_size,
+            'salt': salt,
+            'backend': backend,
+            'iv': iv[:backend.nonce_size],
+            'original_filename': None,
+            'segment_count': None,
+            'master_salt': None,
+            'codec': (flags & FLAG_CODEC_MASK) >> FLAG_CODEC_SHIFT,
+            'plain_size': None
+        }
+        offset = 0
+        while offset + EXT_SIZE <= len(extensions):
+            ext_type, length = struct.unpack_from(EXT_FORMAT, extensions, offset)
+            value = extensions[offset + EXT_SIZE:offset + EXT_SIZE + length]
+            if ext_type == EXT_FILENAME:
+                header['original_filename'] = value.decode('utf-8')
+            elif ext_type == EXT_SEGMENT_COUNT:
+                header['segment_count'] = struct.unpack('>Q', value)[0]
+            elif ext_type == EXT_MASTER_SALT:
+                header['master_salt'] = value
+            elif ext_type == EXT_PLAIN_SIZE:
+                header['plain_size'] = struct.unpack('>Q', value)[0]
+            offset += EXT_SIZE + length
+        if kdf_id == KDF_PBKDF2_HKDF and header['master_salt'] is None:
+            raise ValueError("Master salt tidak ada pada header.")
+        return header
+    
+    def _segment_count(self, original_size, chunk_size):
+        return original_size // chunk_size + 1
+    
+    def _record_size(self, header):
+        # Ukuran satu chunk di file: ciphertext + tag
+        return header['chunk_size'] + TAG_SIZE
+    
+    def _iter_plain_segments(self, f, chunk_size):
+        # Yield (indeks, data, final); segmen terakhir adalah chunk yang tidak
+        # penuh (bisa kosong) dan selalu mendapat padding
+        index = 0
+        while True:
+            data = f.read(chunk_size)
+            final = len(data) < chunk_size
+            yield index, data, final
+            if final:
+                return
+            index += 1
+    
+    def _iter_cipher_segments(self, f, chunk_size):
+        # Yield (indeks, data, final); baca satu chunk ke depan untuk menandai chunk terakhir
+        index = 0
+        current = f.read(chunk_size)
+        while True:
+            following = f.read(chunk_size) if len(current) == chunk_size else b''
+            final = not following
+            yield index, current, final
+            if final:
+                return
+            index += 1
+            current = following
+    
+    def _map_ordered(self, func, items):
+        # Seperti executor.map, tetapi jumlah segmen di memori dibatasi
+        # dan hasil dikembalikan sesuai urutan input
+        window = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for item in items:
+                pending.append(executor.submit(func, *item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _is_binary_container(self, input_path):
+        with open(input_path, 'rb') as f:
+            return f.read(len(FILE_MAGIC)) == FILE_MAGIC
+    
+    def _reporter(self, progress, total, chunk_size):
+        # progress(byte_selesai, total) dipanggil tiap chunk selesai; callback
+        # boleh melempar OperationCancelled untuk membatalkan operasi
+        if progress is None:
+            return None
+        return lambda index: progress(min((index + 1) * chunk_size, total), total)
+    
+    def _choose_codec(self, input_path, compression):
+        # Codec untuk file ini; kompresi dilewati jika sampel awal tidak menghemat
+        if compression is None:
+            return CODEC_NONE
+        codec = CODEC_ZLIB if compression == 'auto' else COMPRESSION_CODECS.get(compression)
+        if codec is None:
+            raise ValueError(f"Kompresi '{compression}' tidak didukung (zlib/lzma/bz2/auto).")
+        with open(input_path, 'rb') as f:
+            sample = f.read(COMPRESSION_SAMPLE)
+        compressor = self._compressor(codec)
+        packed = compressor.compress(sample) + compressor.flush()
+        if not sample or len(packed) >= len(sample) * 0.95:
+            return CODEC_NONE
+        return codec
+    
+    def _compressor(self, codec):
+        if codec == CODEC_ZLIB:
+            return zlib.compressobj(6)
+        if codec == CODEC_LZMA:
+            return lzma.LZMACompressor()
+        return bz2.BZ2Compressor()
+    
+    def _decompressor(self, codec):
+        if codec == CODEC_ZLIB:
+            return zlib.decompressobj()
+        if codec == CODEC_LZMA:
+            return lzma.LZMADecompressor()
+        if codec == CODEC_BZ2:
+            return bz2.BZ2Decompressor()
+        raise ValueError(f"Codec kompresi {codec} tidak dikenal.")
+    
+    def _open_payload(self, input_path, codec, output_path, progress=None):
+        # File yang akan dienkripsi: input langsung, atau file sementara berisi
+        # hasil kompresi streaming (ukurannya harus diketahui sebelum header ditulis)
+        if codec == CODEC_NONE:
+            return open(input_path, 'rb')
+        payload = tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(output_path)))
+        try:
+            compressor = self._compressor(codec)
+            total = os.path.getsize(input_path)
+            report = self._reporter(progress, total, self.chunk_size)
+            with open(input_path, 'rb') as src:
+                index = 0
+                while True:
+                    data = src.read(self.chunk_size)
+                    if not data:
+                        break
+                    payload.write(compressor.compress(data))
+                    if report is not None:
+                        report(index)
+                    index += 1
+            payload.write(compressor.flush())
+            payload.flush()
+            payload.seek(0)
+            return payload
+        except BaseException:
+            payload.close()
+            raise
     
-    def encrypt_file(self, input_path, password, output_path=None):
+    def encrypt_file(self, input_path, password, output_path=None, segmented=False, algorithm=None,
+                     compression=None, progress=None):
+        # compression: None, 'zlib', 'lzma', 'bz2' atau 'auto' (zlib)
+        return self._encrypt_file(input_path, _PasswordKeys(password), output_path,
+                                  segmented, algorithm, compression, progress)
+    
+    def _encrypt_file(self, input_path, keys, output_path=None, segmented=False, algorithm=None,
+                      compression=None, progress=None):
         try:
             if not os.path.exists(input_path):
                 return False, "File tidak ditemukan!", None
 
+            algorithm = algorithm or self.algorithm
+            backend = CIPHER_BACKENDS.get(algorithm)
+            if backend is None:
+                return False, f"Algoritma {algorithm} tidak didukung!", None
+
+            if self.chunk_size <= 0 or self.chunk_size % backend.block_size:
+                return False, f"Ukuran chunk harus kelipatan {backend.block_size} byte!", None
+
+            # Cipher AEAD selalu memakai segmen mandiri (chain CBC hanya untuk 3DES)
+            if not isinstance(backend, TripleDESBackend):
+                segmented = True
+
             if output_path is None:
                 output_path = input_path + ".encrypted"
 
-            with open(input_path, 'rb') as f:
-                file_data = f.read()
-
-            key, salt = self._derive_key(password)
+            key, salt, kdf_id, master_salt = keys.new_file_key(backend.key_size)
 
-            iv = get_random_bytes(self.block_size)
-            cipher = DES3.new(key, DES3.MODE_CBC, iv=iv)
+            iv = get_random_bytes(backend.nonce_size)
 
-            padded_data = pad(file_data, self.block_size)
-            ciphertext = cipher.encrypt(padded_data)
+            plain_size = os.path.getsize(input_path)
+            codec = self._choose_codec(input_path, compression)
 
-            encrypted_data = {
-                'algorithm': self.algorithm,
-                'salt': base64.b64encode(salt).decode('utf-8'),
-                'iv': base64.b64encode(iv).decode('utf-8'),
-                'ciphertext': base64.b64encode(ciphertext).decode('utf-8'),
-                'original_filename': os.path.basename(input_path)
-            }
+            with self._open_payload(input_path, codec, output_path, progress) as src, \
+                    open(output_path, 'w+b') as dst:
+                # Untuk file terkompresi, data yang dienkripsi adalah hasil kompresi
+                original_size = os.fstat(src.fileno()).st_size
+                flags = (FLAG_AUTHENTICATED | (FLAG_SEGMENTED if segmented else 0)
+                         | (codec << FLAG_CODEC_SHIFT))
+                header = self._build_header(salt, iv, original_size,
+                                            os.path.basename(input_path), flags,
+                                            kdf_id, master_salt, algorithm,
+                                            plain_size if codec != CODEC_NONE else None)
+                auth = _ChunkAuth(key, header)
+                if codec == CODEC_NONE:
+                    report = self._reporter(progress, original_size, self.chunk_size)
+                else:
+                    # Seluruh input sudah terbaca saat kompresi
+                    report = self._reporter(progress, plain_size, plain_size)
 
-            with open(output_path, 'w') as f:
-                json.dump(encrypted_data, f)
+                dst.write(header)
+                dst.write(auth.header_mac)
+                if self.use_mmap and original_size > 0:
+                    self._encrypt_mapped(src, dst, backend, key, iv, auth, segmented, original_size, report)
+                elif segmented:
+                    self._encrypt_segments(src, dst, backend, key, iv, auth, report)
+                else:
+                    self._encrypt_stream(src, dst, backend.new_cipher(key, iv), auth, report)
 
             file_size = os.path.getsize(output_path)
+            if codec != CODEC_NONE:
+                return True, (f"Enkripsi berhasil! Ukuran: {self._format_size(file_size)} "
+                              f"(dikompresi {CODEC_NAMES[codec]} dari {self._format_size(plain_size)})"), output_path
             return True, f"Enkripsi berhasil! Ukuran: {self._format_size(file_size)}", output_path
 
+        except OperationCancelled as e:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return False, str(e) or "Operasi dibatalkan.", None
         except Exception as e:
             return False, f"Error: {str(e)}", None
     
-    def decrypt_file(self, input_path, password, output_path=None):
+    def encrypt_file_resumable(self, input_path, password, output_path=None, algorithm=None,
+                               checkpoint_interval=64, progress=None):
+        return self._encrypt_file_resumable(input_path, _PasswordKeys(password), output_path,
+                                            algorithm, checkpoint_interval, progress)
+    
+    def _write_checkpoint(self, checkpoint_path, state):
+        tmp_path = checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, checkpoint_path)
+    
+    def _encrypt_file_resumable(self, input_path, keys, output_path=None, algorithm=None,
+                                checkpoint_interval=64, progress=None):
+        # Mode segmented yang ditulis ke <output>.part dengan checkpoint JSON
+        # (jumlah segmen yang sudah aman di disk). Jika terputus, pemanggilan
+        # berikutnya melanjutkan dari segmen tersebut; setelah selesai file
+        # diverifikasi lalu di-rename atomik ke output_path.
         try:
             if not os.path.exists(input_path):
                 return False, "File tidak ditemukan!", None
 
-            with open(input_path, 'r') as f:
-                encrypted_data = json.load(f)
-
             if output_path is None:
-                if 'original_filename' in encrypted_data:
-                    output_path = encrypted_data['original_filename']
-                else:
-                    output_path = input_path.replace('.encrypted', '')
+                output_path = input_path + ".encrypted"
+            part_path = output_path + ".part"
+            checkpoint_path = part_path + ".json"
+
+            stat = os.stat(input_path)
+            state = {'input_size': stat.st_size, 'input_mtime': stat.st_mtime_ns, 'completed': 0}
+
+            header = None
+            if os.path.exists(checkpoint_path) and os.path.exists(part_path):
+                with open(checkpoint_path, 'r') as f:
+                    saved = json.load(f)
+                # Checkpoint hanya dipakai jika file input tidak berubah
+                if (saved.get('input_size'), saved.get('input_mtime')) == (stat.st_size, stat.st_mtime_ns):
+                    with open(part_path, 'rb') as f:
+                        header = self._read_header(f)
+                        key = keys.key_for(header)
+                        auth = self._verify_header(f, key, header)
+                        data_start = f.tell()
+                    if not auth:
+                        return False, "Password salah untuk enkripsi yang akan dilanjutkan!", None
+                    state['completed'] = saved['completed']
+
+            if header is None:
+                algorithm = algorithm or self.algorithm
+                backend = CIPHER_BACKENDS.get(algorithm)
+                if backend is None:
+                    return False, f"Algoritma {algorithm} tidak didukung!", None
+                if self.chunk_size <= 0 or self.chunk_size % backend.block_size:
+                    return False, f"Ukuran chunk harus kelipatan {backend.block_size} byte!", None
+
+                key, salt, kdf_id, master_salt = keys.new_file_key(backend.key_size)
+                iv = get_random_bytes(backend.nonce_size)
+                raw = self._build_header(salt, iv, stat.st_size, os.path.basename(input_path),
+                                         FLAG_AUTHENTICATED | FLAG_SEGMENTED, kdf_id, master_salt, algorithm)
+                auth = _ChunkAuth(key, raw)
+                with open(part_path, 'wb') as f:
+                    f.write(raw)
+                    f.write(auth.header_mac)
+                    f.flush()
+                    os.fsync(f.fileno())
+                    data_start = f.tell()
+                self._write_checkpoint(checkpoint_path, state)
+                header = {'backend': backend, 'iv': iv, 'chunk_size': self.chunk_size,
+                          'original_size': stat.st_size}
+
+            backend = header['backend']
+            chunk_size = header['chunk_size']
+            count = self._segment_count(header['original_size'], chunk_size)
+            resumed = state['completed']
+            report = self._reporter(progress, header['original_size'], chunk_size)
+
+            with open(input_path, 'rb') as src, open(part_path, 'r+b') as dst:
+                # Buang segmen yang ditulis setelah checkpoint terakhir
+                dst.truncate(data_start + resumed * (chunk_size + TAG_SIZE))
+                dst.seek(0, os.SEEK_END)
+                src.seek(resumed * chunk_size)
+                if resumed < count:
+                    segments = ((key, header['iv'], resumed + index, data, final, auth)
+                                for index, data, final in self._iter_plain_segments(src, chunk_size))
+                    results = self._map_ordered(backend.encrypt_segment, segments)
+                    for completed, ciphertext in enumerate(results, resumed + 1):
+                        dst.write(ciphertext)
+                        if completed % checkpoint_interval == 0 or completed == count:
+                            # Data harus aman di disk sebelum checkpoint mengakuinya
+                            dst.flush()
+                            os.fsync(dst.fileno())
+                            state['completed'] = completed
+                            self._write_checkpoint(checkpoint_path, state)
+                        if report is not None:
+                            report(completed - 1)
+
+            # Verifikasi seluruh chunk sebelum file dianggap selesai
+            with open(part_path, 'rb') as src, open(os.devnull, 'wb') as sink:
+                verify_header = self._read_header(src)
+                verify_auth = self._verify_header(src, key, verify_header)
+                if not verify_auth:
+                    raise ChunkIntegrityError("Header file rusak.")
+                self._decrypt_segments(src, sink, key, verify_header, verify_auth)
+
+            os.replace(part_path, output_path)
+            os.remove(checkpoint_path)
+
+            file_size = os.path.getsize(output_path)
+            if resumed:
+                return True, (f"Enkripsi berhasil! Ukuran: {self._format_size(file_size)} "
+                              f"(dilanjutkan dari chunk ke-{resumed + 1})"), output_path
+            return True, f"Enkripsi berhasil! Ukuran: {self._format_size(file_size)}", output_path
 
-            salt = base64.b64decode(encrypted_data['salt'])
-            iv = base64.b64decode(encrypted_data['iv'])
-            ciphertext = base64.b64decode(encrypted_data['ciphertext'])
+        except OperationCancelled as e:
+            return False, f"{str(e) or 'Operasi dibatalkan.'} Jalankan lagi untuk melanjutkan.", None
+        except ValueError as e:
+            # Hasil tidak valid: mulai dari awal pada pemanggilan berikutnya
+            for path in (part_path, checkpoint_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False, f"Enkripsi gagal diverifikasi! {str(e)}", None
+        except Exception as e:
+            return False, f"Error: {str(e)}", None
+    
+    def decrypt_file(self, input_path, password, output_path=None, progress=None):
+        return self._decrypt_file(input_path, _PasswordKeys(password), output_path, progress)
+    
+    def _decrypt_file(self, input_path, keys, output_path=None, progress=None):
+        try:
+            if not os.path.exists(input_path):
+                return False, "File tidak ditemukan!", None
 
-            key = PBKDF2(password, salt, dkLen=24, count=100000)
+            if self._is_binary_container(input_path):
+                return self._decrypt_binary(input_path, keys, output_path, progress)
 
-            cipher = DES3.new(key, DES3.MODE_CBC, iv=iv)
-            padded_data = cipher.decrypt(ciphertext)
+            # Format lama (JSON + base64), dibaca streaming tanpa memuat seluruh file
+            with open(input_path, 'rb') as f:
+                fields, reader, size = self._open_legacy(f, keys.password)
+                report = self._reporter(progress, size, self.chunk_size)
 
-            file_data = unpad(padded_data, self.block_size)
+                if output_path is None:
+                    if 'original_filename' in fields:
+                        output_path = fields['original_filename']
+                    else:
+                        output_path = input_path.replace('.encrypted', '')
 
-            with open(output_path, 'wb') as f:
-                f.write(file_data)
+                try:
+                    with open(output_path, 'wb') as dst:
+                        index = 0
+                        while True:
+                            data = reader.read(self.chunk_size)
+                            if not data:
+                                break
+                            dst.write(data)
+                            if report is not None:
+                                report(index)
+                            index += 1
+                except OperationCancelled as e:
+                    os.remove(output_path)
+                    return False, str(e) or "Operasi dibatalkan.", None
+                except ValueError:
+                    os.remove(output_path)
+                    raise
 
             file_size = os.path.getsize(output_path)
             return True, f"Dekripsi berhasil! Ukuran: {self._format_size(file_size)}", output_path
@@ -92,6 +898,328 @@ class TripleDESFileEncryption:
         except Exception as e:
             return False, f"Error: {str(e)}", None
     
+    def _open_legacy(self, f, password):
+        # Kembalikan (field JSON, pembaca plaintext, ukuran plaintext) file format lama
+        fields, span = _LegacyJsonScanner(f).scan()
+        salt = base64.b64decode(fields['salt'])
+        iv = base64.b64decode(fields['iv'])
+        key = PBKDF2(password, salt, dkLen=24, count=100000)
+        size = self._legacy_plain_size(f, span, key, iv)
+        reader = _LegacyPlainReader(f, span, DES3.new(key, DES3.MODE_CBC, iv=iv), self.block_size)
+        return fields, reader, size
+    
+    def _legacy_plain_size(self, f, span, key, iv):
+        # Ukuran plaintext = panjang ciphertext - padding; padding diketahui
+        # dengan mendekripsi blok terakhir saja (sekaligus cek password awal)
+        start, end = span
+        if end == start or (end - start) % 4:
+            raise ValueError("Panjang ciphertext tidak valid.")
+        tail_start = max(start, end - 32)
+        f.seek(tail_start)
+        tail = base64.b64decode(f.read(end - tail_start))
+        total = (tail_start - start) // 4 * 3 + len(tail)
+        if total % self.block_size:
+            raise ValueError("Panjang ciphertext tidak valid.")
+        blocks = iv + tail if tail_start == start else tail
+        last = DES3.new(key, DES3.MODE_CBC, iv=blocks[-16:-8]).decrypt(blocks[-8:])
+        return total - self.block_size + len(unpad(last, self.block_size))
+    
+    def convert_legacy_file(self, input_path, password, output_path=None, algorithm=None, segmented=True):
+        return self._convert_legacy(input_path, _PasswordKeys(password), output_path, algorithm, segmented)
+    
+    def _convert_legacy(self, input_path, keys, output_path=None, algorithm=None, segmented=True):
+        # Migrasi file JSON lama ke container biner secara streaming. Tanpa
+        # output_path, file lama diganti di tempat (atomik).
+        target = output_path or input_path
+        tmp_path = target + ".tmp"
+        try:
+            if not os.path.exists(input_path):
+                return False, "File tidak ditemukan!", None
+            if self._is_binary_container(input_path):
+                return False, "File sudah dalam format biner.", None
+
+            algorithm = algorithm or self.algorithm
+            backend = CIPHER_BACKENDS.get(algorithm)
+            if backend is None:
+                return False, f"Algoritma {algorithm} tidak didukung!", None
+            if not isinstance(backend, TripleDESBackend):
+                segmented = True
+
+            with open(input_path, 'rb') as f:
+                fields, reader, size = self._open_legacy(f, keys.password)
+                filename = fields.get('original_filename') or os.path.basename(input_path).replace('.encrypted', '')
+
+                key, salt, kdf_id, master_salt = keys.new_file_key(backend.key_size)
+                iv = get_random_bytes(backend.nonce_size)
+                flags = FLAG_AUTHENTICATED | (FLAG_SEGMENTED if segmented else 0)
+                header = self._build_header(salt, iv, size, filename, flags, kdf_id, master_salt, algorithm)
+                auth = _ChunkAuth(key, header)
+
+                with open(tmp_path, 'wb') as dst:
+                    dst.write(header)
+                    dst.write(auth.header_mac)
+                    if segmented:
+                        self._encrypt_segments(reader, dst, backend, key, iv, auth)
+                    else:
+                        self._encrypt_stream(reader, dst, backend.new_cipher(key, iv), auth)
+
+            os.replace(tmp_path, target)
+            file_size = os.path.getsize(target)
+            return True, f"Konversi berhasil! Ukuran: {self._format_size(file_size)}", target
+
+        except ValueError as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, "Konversi gagal! Password salah atau file rusak.", None
+        except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False, f"Error: {str(e)}", None
+    
+    def _encrypt_stream(self, src, dst, cipher, auth, report=None):
+        # Enkripsi per chunk: state CBC dibawa objek cipher antar chunk,
+        # padding hanya pada chunk terakhir
+        for index, data, final in self._iter_plain_segments(src, self.chunk_size):
+            ciphertext = cipher.encrypt(pad(data, self.block_size) if final else data)
+            dst.write(ciphertext)
+            dst.write(auth.tag(index, final, ciphertext))
+            if report is not None:
+                report(index)
+    
+    def _decrypt_stream(self, src, dst, cipher, header, auth, report=None):
+        for index, record, final in self._iter_cipher_segments(src, self._record_size(header)):
+            data = auth.verify(index, final, record)
+            if len(data) % self.block_size:
+                raise ValueError("Panjang ciphertext tidak valid.")
+            plain = cipher.decrypt(data)
+            dst.write(unpad(plain, self.block_size) if final else plain)
+            if report is not None:
+                report(index)
+    
+    def _encrypt_segments(self, src, dst, backend, key, iv, auth, report=None):
+        # Segmen mandiri dienkripsi paralel, ditulis sesuai urutan
+        segments = ((key, iv, index, data, final, auth)
+                    for index, data, final in self._iter_plain_segments(src, self.chunk_size))
+        for index, ciphertext in enumerate(self._map_ordered(backend.encrypt_segment, segments)):
+            dst.write(ciphertext)
+            if report is not None:
+                report(index)
+    
+    def _decrypt_segments(self, src, dst, key, header, auth, report=None):
+        segments = ((key, header['iv'], index, data, final, auth)
+                    for index, data, final in self._iter_cipher_segments(src, self._record_size(header)))
+        count = 0
+        for plaintext in self._map_ordered(header['backend'].decrypt_segment, segments):
+            dst.write(plaintext)
+            if report is not None:
+                report(count)
+            count += 1
+        if header['segment_count'] is not None and count != header['segment_count']:
+            raise ValueError("Jumlah segmen tidak sesuai header.")
+    
+    def _cipher_size(self, backend, original_size, chunk_size):
+        # Ukuran seluruh record chunk (ciphertext + tag) untuk ukuran plaintext tertentu
+        full, rest = divmod(original_size, chunk_size)
+        return full * (chunk_size + TAG_SIZE) + backend.cipher_size(rest, True) + TAG_SIZE
+    
+    def _run_mapped(self, src, dst, dst_size, func, *args):
+        # Jalankan func(mmap input, mmap output, *args) dengan output
+        # dialokasikan sebesar dst_size. func wajib melepas semua memoryview
+        # sebelum selesai (juga saat error) agar mmap bisa ditutup.
+        dst.truncate(dst_size)
+        with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as src_map, \
+                mmap.mmap(dst.fileno(), dst_size) as dst_map:
+            func(src_map, dst_map, *args)
+    
+    def _release_views(self, views, jobs):
+        # Traceback error masih memegang frame beserta view mmap di dalamnya;
+        # view dilepas eksplisit agar error asli bisa diteruskan apa adanya
+        for _, data, _, out in jobs:
+            data.release()
+            out.release()
+        jobs.clear()
+        for view in views:
+            view.release()
+    
+    def _encrypt_mapped(self, src, dst, backend, key, iv, auth, segmented, original_size, report=None):
+        data_start = dst.tell()
+        size = data_start + self._cipher_size(backend, original_size, self.chunk_size)
+        self._run_mapped(src, dst, size, self._encrypt_views,
+                         data_start, backend, key, iv, auth, segmented, original_size, report)
+    
+    def _encrypt_views(self, src_map, dst_map, data_start, backend, key, iv, auth, segmented,
+                       original_size, report):
+        source = memoryview(src_map)
+        target = memoryview(dst_map)[data_start:]
+        record_size = self.chunk_size + TAG_SIZE
+        last_index = original_size // self.chunk_size
+        # Posisi tiap chunk tetap, jadi segmen paralel menulis langsung ke
+        # bagiannya masing-masing di output
+        jobs = []
+        try:
+            for index in range(last_index + 1):
+                data = source[index * self.chunk_size:(index + 1) * self.chunk_size]
+                final = index == last_index
+                start = index * record_size
+                out = target[start:start + backend.cipher_size(len(data), final) + TAG_SIZE]
+                jobs.append((index, data, final, out))
+            if segmented:
+                for index, _ in enumerate(self._map_ordered(backend.encrypt_segment_into, (
+                        (key, iv, index, data, final, auth, out) for index, data, final, out in jobs))):
+                    if report is not None:
+                        report(index)
+            else:
+                cipher = backend.new_cipher(key, iv)
+                for index, data, final, out in jobs:
+                    backend.seal_into(cipher, index, data, final, auth, out)
+                    if report is not None:
+                        report(index)
+        finally:
+            self._release_views((source, target), jobs)
+    
+    def _decrypt_mapped(self, src, dst, key, header, auth, report=None):
+        data_start = src.tell()
+        expected = data_start + self._cipher_size(header['backend'], header['original_size'],
+                                                  header['chunk_size'])
+        if os.fstat(src.fileno()).st_size != expected:
+            raise ChunkIntegrityError("File rusak atau terpotong (ukuran tidak sesuai header).")
+        self._run_mapped(src, dst, header['original_size'], self._decrypt_views,
+                         data_start, key, header, auth, report)
+    
+    def _decrypt_views(self, src_map, dst_map, data_start, key, header, auth, report):
+        backend = header['backend']
+        chunk_size = header['chunk_size']
+        source = memoryview(src_map)[data_start:]
+        target = memoryview(dst_map)
+        record_size = self._record_size(header)
+        last_index = header['original_size'] // chunk_size
+        jobs = []
+        try:
+            for index in range(last_index + 1):
+                out = target[index * chunk_size:(index + 1) * chunk_size]
+                final = index == last_index
+                start = index * record_size
+                record = source[start:start + backend.cipher_size(len(out), final) + record_size - chunk_size]
+                jobs.append((index, record, final, out))
+            if header['flags'] & FLAG_SEGMENTED:
+                for index, _ in enumerate(self._map_ordered(backend.decrypt_segment_into, (
+                        (key, header['iv'], index, record, final, auth, out)
+                        for index, record, final, out in jobs))):
+                    if report is not None:
+                        report(index)
+            else:
+                cipher = backend.new_cipher(key, header['iv'])
+                for index, record, final, out in jobs:
+                    backend.open_into(cipher, index, record, final, auth, out)
+                    if report is not None:
+                        report(index)
+        finally:
+            self._release_views((source, target), jobs)
+    
+    def _verify_header(self, src, key, header):
+        # Cek HMAC header tepat setelah derivasi kunci: password salah atau
+        # header yang diubah ditolak sebelum ciphertext dibaca.
+        # Kembalikan _ChunkAuth, atau None jika HMAC header tidak cocok.
+        auth = _ChunkAuth(key, header['raw'])
+        if not hmac.compare_digest(auth.header_mac, src.read(HEADER_MAC_SIZE)):
+            return None
+        return auth
+    
+    def _decrypt_binary(self, input_path, keys, output_path, progress=None):
+        with open(input_path, 'rb') as src:
+            header = self._read_header(src)
+
+            if output_path is None:
+                output_path = header['original_filename'] or input_path.replace('.encrypted', '')
+
+            key = keys.key_for(header)
+            auth = self._verify_header(src, key, header)
+            if auth is None:
+                return False, "Dekripsi gagal! Password salah atau header file rusak.", None
+
+            report = self._reporter(progress, header['original_size'], header['chunk_size'])
+            compressed = header['codec'] != CODEC_NONE
+            try:
+                with open(output_path, 'w+b') as dst:
+                    # File terkompresi didekompresi sambil ditulis (jalur streaming)
+                    target = _DecompressWriter(dst, self._decompressor(header['codec'])) if compressed else dst
+                    if self.use_mmap and header['original_size'] > 0 and not compressed:
+                        self._decrypt_mapped(src, dst, key, header, auth, report)
+                    elif header['flags'] & FLAG_SEGMENTED:
+                        self._decrypt_segments(src, target, key, header, auth, report)
+                    else:
+                        cipher = header['backend'].new_cipher(key, header['iv'])
+                        self._decrypt_stream(src, target, cipher, header, auth, report)
+                    if compressed:
+                        target.finish()
+                        if header['plain_size'] is not None and target.size != header['plain_size']:
+                            raise ValueError("Ukuran file hasil dekompresi tidak sesuai header.")
+            except ChunkIntegrityError as e:
+                os.remove(output_path)
+                return False, f"Dekripsi gagal! {str(e)}", None
+            except OperationCancelled as e:
+                os.remove(output_path)
+                return False, str(e) or "Operasi dibatalkan.", None
+            except ValueError:
+                os.remove(output_path)
+                raise
+
+        file_size = os.path.getsize(output_path)
+        return True, f"Dekripsi berhasil! Ukuran: {self._format_size(file_size)}", output_path
+    
+    def decrypt_range(self, input_path, password, offset, length):
+        return self._decrypt_range(input_path, _PasswordKeys(password), offset, length)
+    
+    def _decrypt_range(self, input_path, keys, offset, length):
+        # Dekripsi hanya segmen yang mencakup byte [offset, offset + length)
+        try:
+            if offset < 0 or length < 0:
+                return False, "Offset dan panjang tidak boleh negatif!"
+            if not os.path.exists(input_path):
+                return False, "File tidak ditemukan!"
+            if not self._is_binary_container(input_path):
+                return False, "Format lama (JSON) tidak mendukung akses acak."
+
+            with open(input_path, 'rb') as src:
+                header = self._read_header(src)
+                if not header['flags'] & FLAG_SEGMENTED:
+                    return False, "File tidak mendukung akses acak. Enkripsi ulang dengan mode segmented."
+                if header['codec'] != CODEC_NONE:
+                    return False, "File terkompresi tidak mendukung akses acak. Enkripsi ulang tanpa kompresi."
+
+                key = keys.key_for(header)
+                auth = self._verify_header(src, key, header)
+                if auth is None:
+                    return False, "Dekripsi gagal! Password salah atau header file rusak."
+
+                # Range dipotong setelah password terverifikasi
+                end = min(offset + length, header['original_size'])
+                if offset >= end:
+                    return True, b''
+                data_start = src.tell()
+                record_size = self._record_size(header)
+                chunk_size = header['chunk_size']
+                last_index = header['original_size'] // chunk_size
+                first_index = offset // chunk_size
+
+                # Segmen berukuran tetap, jadi posisinya bisa dihitung langsung
+                def read_segments():
+                    for index in range(first_index, (end - 1) // chunk_size + 1):
+                        src.seek(data_start + index * record_size)
+                        yield key, header['iv'], index, src.read(record_size), index == last_index, auth
+
+                data = b''.join(self._map_ordered(header['backend'].decrypt_segment, read_segments()))
+
+            start = offset - first_index * chunk_size
+            return True, data[start:start + end - offset]
+
+        except ChunkIntegrityError as e:
+            return False, f"Dekripsi gagal! {str(e)}"
+        except ValueError as e:
+            return False, "Dekripsi gagal! Password salah atau file rusak."
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
     def _format_size(self, size_bytes):
         for unit in ['B', 'KB', 'MB', 'GB']:
             if size_bytes < 1024.0:
@@ -99,3 +1227,37 @@ class TripleDESFileEncryption:
             size_bytes /= 1024.0
         return f"{size_bytes:.2f} TB"
 
+
+class FileEncryptionSession:
+    # Sesi batch untuk banyak file dengan satu password: PBKDF2 dijalankan
+    # sekali (master key), kunci tiap file diturunkan dengan HKDF + salt file.
+    # master_salt dapat diisi untuk memakai ulang master key run sebelumnya.
+    def __init__(self, password, encryption=None, master_salt=None):
+        self.encryption = encryption or TripleDESFileEncryption()
+        self._keys = _PasswordKeys(password, use_master=True, master_salt=master_salt)
+    
+    @property
+    def master_salt(self):
+        return self._keys.master_salt
+    
+    def derive_key(self, context, key_size=32):
+        return self._keys.master_subkey(context, key_size)
+    
+    def encrypt_file(self, input_path, output_path=None, segmented=False, algorithm=None,
+                     compression=None, progress=None):
+        return self.encryption._encrypt_file(input_path, self._keys, output_path, segmented,
+                                             algorithm, compression, progress)
+    
+    def encrypt_file_resumable(self, input_path, output_path=None, algorithm=None,
+                               checkpoint_interval=64, progress=None):
+        return self.encryption._encrypt_file_resumable(input_path, self._keys, output_path, algorithm,
+                                                       checkpoint_interval, progress)
+    
+    def decrypt_file(self, input_path, output_path=None, progress=None):
+        return self.encryption._decrypt_file(input_path, self._keys, output_path, progress)
+    
+    def decrypt_range(self, input_path, offset, length):
+        return self.encryption._decrypt_range(input_path, self._keys, offset, length)
+    
+    def convert_legacy_file(self, input_path, output_path=None, algorithm=None, segmented=True):
+        return self.encryption._convert_legacy(input_path, self._keys, output_path, algorithm, segmented)
@@ -1,11 +1,70 @@
 from PIL import Image
 import numpy as np
 import os
+import lzma
+import struct
+import zlib
+
+
+# Header stego: magic, versi, flags, panjang payload (bytes), CRC32 payload
+HEADER_MAGIC = b'CMST'
+HEADER_VERSION = 1
+HEADER_FORMAT = '>4sBBII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Header selalu disimpan 1 bit per channel agar bisa dibaca sebelum k diketahui
+HEADER_BITS = HEADER_SIZE * 8
+
+# flags bit 0-1: jumlah bit per channel untuk payload (k - 1)
+FLAG_BITS_MASK = 0x03
+MAX_BITS_PER_CHANNEL = 4
+
+# flags bit 2-3: kompresi payload, bit 4: payload biner (bukan teks UTF-8)
+FLAG_CODEC_SHIFT = 2
+FLAG_CODEC_MASK = 0x0C
+FLAG_BINARY = 0x10
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+COMPRESSION_CODECS = {'zlib': CODEC_ZLIB, 'lzma': CODEC_LZMA}
+# Sampel awal payload untuk mendeteksi data yang tidak bisa dikompres
+COMPRESSION_SAMPLE = 64 * 1024
+
+# Byte yang mungkin muncul dalam pesan format lama (teks + delimiter)
+LEGACY_TEXT_BYTES = bytes([9, 10, 13]) + bytes(range(32, 256))
+
+
+class _ChannelReader:
+    # Membaca nilai channel (urutan flatten RGB) secara berurutan dari band
+    def __init__(self, bands):
+        self._bands = bands
+        self._buffer = np.empty(0, dtype=np.uint8)
+    
+    def read(self, count):
+        # Kembalikan hingga `count` nilai; lebih sedikit jika gambar habis
+        parts = []
+        while count > 0:
+            if self._buffer.size == 0:
+                band = next(self._bands, None)
+                if band is None:
+                    break
+                self._buffer = band.reshape(-1)
+            part = self._buffer[:count]
+            self._buffer = self._buffer[part.size:]
+            parts.append(part)
+            count -= part.size
+        return np.concatenate(parts) if parts else self._buffer[:0]
 
 
 class ImageSteganography:
-    def __init__(self):
+    def __init__(self, tile_bytes=8 * 1024 * 1024, max_decompressed_bytes=64 * 1024 * 1024):
         self.delimiter = "$$$END$$$" 
+        # Ukuran chunk (bytes pesan) saat ekstraksi
+        self.first_chunk_bytes = 1024
+        self.max_chunk_bytes = 1024 * 1024
+        # Batas memori per band (tile baris) saat membaca/menulis pixel
+        self.tile_bytes = tile_bytes
+        # Batas hasil dekompresi payload (cegah payload kecil mengembang jadi gigabyte)
+        self.max_decompressed_bytes = max_decompressed_bytes
     
     def text_to_binary(self, text):
         return ''.join(format(ord(char), '08b') for char in text)
@@ -18,48 +77,165 @@ class ImageSteganography:
                 text += chr(int(byte, 2))
         return text
     
-    def calculate_capacity(self, image_path):
+    def _payload_bits(self, payload):
+        # Bytes -> array bit (MSB dulu), sama dengan urutan format(..., '08b')
+        return np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+    
+    def _bits_to_values(self, bits, bits_per_channel):
+        # Kelompokkan bit per k -> nilai k-bit yang ditulis ke tiap channel
+        k = bits_per_channel
+        pad = (-bits.size) % k
+        if pad:
+            bits = np.concatenate([bits, np.zeros(pad, dtype=np.uint8)])
+        if k == 1:
+            return bits
+        return np.packbits(bits.reshape(-1, k), axis=1)[:, 0] >> (8 - k)
+    
+    def _values_to_bytes(self, values, bits_per_channel, length):
+        k = bits_per_channel
+        bits = np.unpackbits(values.reshape(-1, 1), axis=1)[:, 8 - k:].reshape(-1)
+        return np.packbits(bits[:length * 8]).tobytes()
+    
+    def _band_rows(self, width):
+        return max(1, self.tile_bytes // (width * 3))
+    
+    def _iter_bands(self, img, start_row=0):
+        # Yield band RGB (rows x width x 3); hanya satu band di memori
+        width, height = img.size
+        rows = self._band_rows(width)
+        for top in range(start_row, height, rows):
+            band = img.crop((0, top, width, min(top + rows, height)))
+            if band.mode != 'RGB':
+                band = band.convert('RGB')
+            yield np.asarray(band)
+    
+    def _write_channels(self, img, start, values, keep_mask):
+        # Tulis `values` ke channel [start, start + len) band demi band;
+        # band di luar rentang ini tidak disentuh
+        width, height = img.size
+        row_channels = width * 3
+        rows = self._band_rows(width)
+        end = start + values.size
+        top = (start // row_channels) // rows * rows
+        while top < height and top * row_channels < end:
+            bottom = min(top + rows, height)
+            box = (0, top, width, bottom)
+            band = np.array(img.crop(box))
+            flat = band.reshape(-1)
+            offset = top * row_channels
+            lo = max(start, offset)
+            hi = min(end, bottom * row_channels)
+            flat[lo - offset:hi - offset] = (flat[lo - offset:hi - offset] & keep_mask) | values[lo - start:hi - start]
+            img.paste(Image.fromarray(band), box)
+            top = bottom
+    
+    def _build_header(self, payload, flags=0):
+        return struct.pack(HEADER_FORMAT, HEADER_MAGIC, HEADER_VERSION, flags,
+                           len(payload), zlib.crc32(payload))
+    
+    def _compress(self, data, compression):
+        # Kembalikan (codec, data); kompresi dilewati jika tidak menghemat
+        if compression is None or not data:
+            return CODEC_NONE, data
+        codec = CODEC_ZLIB if compression == 'auto' else COMPRESSION_CODECS.get(compression)
+        if codec is None:
+            raise ValueError(f"Kompresi '{compression}' tidak didukung (zlib/lzma/auto).")
+        compress = zlib.compress if codec == CODEC_ZLIB else lzma.compress
+        if len(data) > COMPRESSION_SAMPLE:
+            sample = data[:COMPRESSION_SAMPLE]
+            if len(compress(sample)) >= len(sample) * 0.95:
+                return CODEC_NONE, data
+        packed = compress(data)
+        if len(packed) >= len(data):
+            return CODEC_NONE, data
+        return codec, packed
+    
+    def _decompress(self, data, codec):
+        if codec == CODEC_NONE:
+            return data
+        if codec == CODEC_ZLIB:
+            decompressor = zlib.decompressobj()
+        elif codec == CODEC_LZMA:
+            decompressor = lzma.LZMADecompressor()
+        else:
+            raise ValueError(f"Codec kompresi {codec} tidak dikenal.")
+        limit = self.max_decompressed_bytes
+        result = decompressor.decompress(data, limit + 1)
+        if len(result) > limit:
+            raise ValueError(f"Pesan tersembunyi melebihi batas dekompresi ({limit} bytes).")
+        if not decompressor.eof:
+            raise ValueError("Pesan tersembunyi rusak (data terkompresi tidak lengkap).")
+        return result
+    
+    def _capacity_bytes(self, total_channels, bits_per_channel):
+        return max(0, (total_channels - HEADER_BITS) * bits_per_channel // 8)
+    
+    def plan_bits_per_channel(self, total_channels, payload_length):
+        # Pilih k terkecil (1-4) yang cukup untuk payload, None jika tidak muat
+        if total_channels < HEADER_BITS:
+            return None
+        for k in range(1, MAX_BITS_PER_CHANNEL + 1):
+            if payload_length <= self._capacity_bytes(total_channels, k):
+                return k
+        return None
+    
+    def calculate_capacity(self, image_path, bits_per_channel=1):
         try:
             img = Image.open(image_path)
             width, height = img.size
             total_pixels = width * height * 3  
             
-            # 1 karakter = 8 bits, minus delimiter
-            max_chars = (total_pixels // 8) - len(self.delimiter) - 1
+            # 1 karakter = 8 bits, minus header
+            max_chars = self._capacity_bytes(total_pixels, bits_per_channel)
             
             return max_chars, width, height, total_pixels
         except Exception as e:
             return 0, 0, 0, 0
     
-    def embed_message(self, image_path, message, output_path):
+    def _embed_payload(self, image_path, payload, output_path, flags, bits_per_channel):
+        # Load dan convert image ke RGB
+        img = Image.open(image_path)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        width, height = img.size
+        total_channels = width * height * 3
+        if total_channels < HEADER_BITS:
+            # Header harus tertulis utuh, pesan kosong sekalipun
+            return False, f"Gambar terlalu kecil! Minimal {HEADER_BITS} channel (~{-(-HEADER_BITS // 3)} pixel)."
+        
+        # Validasi kapasitas; bits_per_channel=None -> pilih k otomatis
+        if bits_per_channel is None:
+            k = self.plan_bits_per_channel(total_channels, len(payload))
+            if k is None:
+                max_chars = self._capacity_bytes(total_channels, MAX_BITS_PER_CHANNEL)
+                return False, f"Pesan terlalu panjang! Maksimal ~{max_chars} karakter."
+        else:
+            k = int(bits_per_channel)
+            if not 1 <= k <= MAX_BITS_PER_CHANNEL:
+                return False, f"Bit per channel harus 1-{MAX_BITS_PER_CHANNEL}!"
+            if len(payload) > self._capacity_bytes(total_channels, k):
+                max_chars = self._capacity_bytes(total_channels, k)
+                return False, f"Pesan terlalu panjang! Maksimal ~{max_chars} karakter."
+        
+        # Header (magic + panjang + flags + CRC32) 1 bit/channel, lalu payload k bit/channel
+        header_bits = self._payload_bits(self._build_header(payload, flags | (k - 1)))
+        values = self._bits_to_values(self._payload_bits(payload), k)
+        keep_mask = 0xFF ^ ((1 << k) - 1)
+        
+        # Embed per band; hanya band yang memuat header/payload yang diubah
+        self._write_channels(img, 0, header_bits, 0xFE)
+        self._write_channels(img, HEADER_BITS, values, keep_mask)
+        
+        img.save(output_path, 'PNG')
+        return True, None
+    
+    def embed_message(self, image_path, message, output_path, bits_per_channel=None, compression=None):
         try:
-            # Load dan convert image ke RGB
-            img = Image.open(image_path)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            img_array = np.array(img)
-            
-            # Tambahkan delimiter
-            full_message = message + self.delimiter
-            binary_message = self.text_to_binary(full_message)
-            
-            # Validasi kapasitas
-            max_bits = img_array.size
-            if len(binary_message) > max_bits:
-                return False, f"Pesan terlalu panjang! Maksimal ~{max_bits // 8} karakter."
-            
-            # Flatten array untuk manipulasi LSB dijadikan array 1D
-            flat_img = img_array.flatten()
-            
-            # Embed message ke LSB
-            for i, bit in enumerate(binary_message):
-                flat_img[i] = (flat_img[i] & 0xFE) | int(bit)
-            
-            # Reshape dan save
-            stego_array = flat_img.reshape(img_array.shape)
-            stego_img = Image.fromarray(stego_array.astype('uint8'), mode='RGB')
-            stego_img.save(output_path, 'PNG')
+            codec, payload = self._compress(message.encode('utf-8'), compression)
+            success, msg = self._embed_payload(image_path, payload, output_path,
+                                               codec << FLAG_CODEC_SHIFT, bits_per_channel)
+            if not success:
+                return False, msg
 
             return True, f"Berhasil! Pesan ({len(message)} karakter) disembunyikan dalam gambar."
         
@@ -68,26 +244,140 @@ class ImageSteganography:
         except Exception as e:
             return False, f"Error: {str(e)}"
     
-    def extract_message(self, stego_image_path):
+    def embed_bytes(self, image_path, data, output_path, bits_per_channel=None, compression='auto'):
+        # Sembunyikan data biner (mis. isi file); kompresi zlib/lzma opsional
+        try:
+            codec, payload = self._compress(bytes(data), compression)
+            success, msg = self._embed_payload(image_path, payload, output_path,
+                                               FLAG_BINARY | (codec << FLAG_CODEC_SHIFT),
+                                               bits_per_channel)
+            if not success:
+                return False, msg
+
+            return True, f"Berhasil! Data ({len(data)} bytes, tersimpan {len(payload)} bytes) disembunyikan dalam gambar."
+        
+        except FileNotFoundError:
+            return False, "File gambar tidak ditemukan!"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
+    def _iter_lsb_bytes(self, reader):
+        # Baca LSB per chunk dan pack jadi bytes; chunk membesar bertahap
+        # sehingga pesan pendek hanya menyentuh awal gambar
+        step = self.first_chunk_bytes * 8
+        while True:
+            values = reader.read(step)
+            usable = values.size - (values.size % 8)
+            if usable == 0:
+                return
+            yield np.packbits(values[:usable] & 1).tobytes()
+            step = min(step * 2, self.max_chunk_bytes * 8)
+    
+    def _read_bytes(self, reader, length, bits_per_channel=1):
+        # Baca `length` bytes dari k bit terbawah channel berikutnya,
+        # dikonversi per chunk agar buffer nilai channel tetap kecil
+        k = bits_per_channel
+        chunk_channels = self.max_chunk_bytes * 8
+        data = bytearray()
+        while len(data) < length:
+            take = min(length - len(data), chunk_channels * k // 8)
+            values = reader.read(-(-take * 8 // k))
+            if values.size * k < take * 8:
+                return None
+            data += self._values_to_bytes(values & ((1 << k) - 1), k, take)
+        return bytes(data)
+    
+    def _read_header(self, reader):
+        raw = self._read_bytes(reader, HEADER_SIZE)
+        if raw is None:
+            return None
+        magic, version, flags, length, checksum = struct.unpack(HEADER_FORMAT, raw)
+        if magic != HEADER_MAGIC:
+            return None
+        return {
+            'version': version,
+            'flags': flags,
+            'bits_per_channel': (flags & FLAG_BITS_MASK) + 1,
+            'codec': (flags & FLAG_CODEC_MASK) >> FLAG_CODEC_SHIFT,
+            'length': length,
+            'checksum': checksum
+        }
+    
+    def _read_until_delimiter(self, chunks):
+        # Format lama: teks diakhiri delimiter. Berhenti lebih awal jika
+        # muncul byte yang tidak mungkin ada di teks (gambar tanpa pesan).
+        delimiter = self.delimiter.encode('utf-8')
+        buffer = bytearray()
+        checked = 0
+        for chunk in chunks:
+            # Delimiter bisa terpotong di batas chunk
+            search_from = max(0, len(buffer) - len(delimiter) + 1)
+            buffer += chunk
+            index = buffer.find(delimiter, search_from)
+            end = len(buffer) if index == -1 else index
+            if buffer[checked:end].translate(None, LEGACY_TEXT_BYTES):
+                return None
+            checked = end
+            if index != -1:
+                return bytes(buffer[:index])
+        return None
+    
+    def _decode_text(self, data):
         try:
-            img = Image.open(stego_image_path)
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
+            return data.decode('utf-8')
+        except UnicodeDecodeError:
+            # Gambar lama menyimpan chr() per byte
+            return data.decode('latin-1')
+    
+    def _extract_payload(self, stego_image_path):
+        # Kembalikan (success, payload atau pesan error, header); header None untuk format lama
+        img = Image.open(stego_image_path)
 
-            img_array = np.array(img)
-            flat_img = img_array.flatten()
+        header = self._read_header(_ChannelReader(self._iter_bands(img)))
+        if header is None:
+            # Fallback untuk stego image format lama (delimiter)
+            reader = _ChannelReader(self._iter_bands(img))
+            payload = self._read_until_delimiter(self._iter_lsb_bytes(reader))
+            if payload is None:
+                return False, "Tidak ada pesan tersembunyi ditemukan dalam gambar ini.", None
+            return True, payload, None
 
-            binary_message = ''
-            for pixel_value in flat_img:
-                binary_message += str(pixel_value & 1)
+        if header['version'] > HEADER_VERSION:
+            return False, f"Versi format stego ({header['version']}) tidak didukung.", header
 
-            full_text = self.binary_to_text(binary_message)
+        # Payload dimulai tepat setelah header (channel ke-HEADER_BITS)
+        width, height = img.size
+        if header['length'] > self._capacity_bytes(width * height * 3, header['bits_per_channel']):
+            return False, "Pesan tersembunyi rusak (panjang tidak valid).", header
+        reader = _ChannelReader(self._iter_bands(img, HEADER_BITS // (width * 3)))
+        reader.read(HEADER_BITS % (width * 3))
+        payload = self._read_bytes(reader, header['length'], header['bits_per_channel'])
+        if payload is None or zlib.crc32(payload) != header['checksum']:
+            return False, "Pesan tersembunyi rusak (checksum tidak cocok).", header
+
+        return True, self._decompress(payload, header['codec']), header
+    
+    def extract_message(self, stego_image_path):
+        try:
+            success, payload, header = self._extract_payload(stego_image_path)
+            if not success:
+                return False, payload
+            if header is None:
+                return True, self._decode_text(payload)
+            if header['flags'] & FLAG_BINARY:
+                return False, "Gambar berisi data biner, bukan pesan teks."
 
-            if self.delimiter in full_text:
-                message = full_text.split(self.delimiter)[0]
-                return True, message
-            else:
-                return False, "Tidak ada pesan tersembunyi ditemukan dalam gambar ini."
+            return True, payload.decode('utf-8')
+        
+        except FileNotFoundError:
+            return False, "File gambar tidak ditemukan!"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+    
+    def extract_bytes(self, stego_image_path):
+        try:
+            success, payload, header = self._extract_payload(stego_image_path)
+            return success, payload
         
         except FileNotFoundError:
             return False, "File gambar tidak ditemukan!"
@@ -98,20 +388,27 @@ class ImageSteganography:
         try:
             orig_img = Image.open(original_path)
             stego_img = Image.open(stego_path)
+            if orig_img.size != stego_img.size:
+                return None
 
-            orig_array = np.array(orig_img)
-            stego_array = np.array(stego_img)
-            
-            # Hitung perbedaan
-            diff = np.abs(orig_array.astype(int) - stego_array.astype(int))
+            max_diff = 0
+            diff_sum = 0
+            changed = 0
+            total = 0
+            # Statistik dihitung per band (uint8, tanpa upcast ke int)
+            for orig_band, stego_band in zip(self._iter_bands(orig_img), self._iter_bands(stego_img)):
+                diff = np.maximum(orig_band, stego_band) - np.minimum(orig_band, stego_band)
+                max_diff = max(max_diff, int(diff.max()))
+                diff_sum += int(diff.sum(dtype=np.uint64))
+                changed += int(np.count_nonzero(diff))
+                total += diff.size
             
             return {
-                'max_difference': int(np.max(diff)),
-                'avg_difference': float(np.mean(diff)),
-                'changed_pixels': int(np.sum(diff > 0)),
-                'total_pixels': orig_array.size,
-                'percentage_changed': (np.sum(diff > 0) / orig_array.size) * 100
+                'max_difference': max_diff,
+                'avg_difference': diff_sum / total,
+                'changed_pixels': changed,
+                'total_pixels': total,
+                'percentage_changed': (changed / total) * 100
             }
         except Exception as e:
             return None
-
@@ -0,0 +1,261 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+import numpy as np
+from Crypto.Protocol.KDF import PBKDF2, HKDF
+from Crypto.Hash import SHA256
+from Crypto.Random import get_random_bytes
+
+from crypto_file import CIPHER_BACKENDS, TAG_SIZE, TripleDESBackend, TripleDESFileEncryption
+
+
+STORE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+CHUNK_DIR = 'chunks'
+NONCE_SIZE = 12
+# Gear hash 32 bit: bit ke-k bergantung pada k+1 byte terakhir
+GEAR_WINDOW = 32
+
+
+class IncrementalFileEncryption:
+    # Enkripsi inkremental: file dipotong dengan content-defined chunking
+    # (gear hash), tiap chunk dienkripsi mandiri dan disimpan di direktori
+    # store dengan nama HMAC isi chunk. Enkripsi ulang setelah file diedit
+    # hanya mengenkripsi dan menulis chunk yang berubah.
+    def __init__(self, avg_chunk_size=64 * 1024, min_chunk_size=None, max_chunk_size=None,
+                 algorithm="AES-256-GCM", read_size=8 * 1024 * 1024):
+        bits = max(1, avg_chunk_size.bit_length() - 1)
+        # Batas chunk jika bit teratas hash bernilai nol (peluang 1 / 2^bits)
+        self.mask = ((1 << bits) - 1) << (32 - bits)
+        self.min_chunk_size = min_chunk_size or avg_chunk_size // 4
+        self.max_chunk_size = max_chunk_size or avg_chunk_size * 4
+        self.algorithm = algorithm
+        self.read_size = read_size
+        self.last_stats = None
+    
+    # Format ukuran sama dengan enkripsi file biasa
+    _format_size = TripleDESFileEncryption._format_size
+    
+    def _derive_keys(self, password, salt, key_size):
+        # Satu PBKDF2 per operasi, subkey untuk enkripsi, id chunk, gear table dan manifest
+        master = PBKDF2(password, salt, dkLen=32, count=100000)
+        return {
+            name: HKDF(master, key_size if name in ('chunk', 'manifest') else 32, salt, SHA256,
+                       context=b'CamoCrypt incremental ' + name.encode())
+            for name in ('chunk', 'id', 'gear', 'manifest')
+        }
+    
+    def _gear_table(self, key):
+        # Tabel gear diturunkan dari kunci agar ukuran chunk tidak bisa
+        # dipakai menebak isi file
+        stream = b''.join(hmac.new(key, bytes([i]), hashlib.sha256).digest()[:4] for i in range(256))
+        return np.frombuffer(stream, dtype='>u4').astype(np.uint32)
+    
+    def _gear_hashes(self, gear, tail, data):
+        # H_i = (H_{i-1} << 1) + G[b_i] (mod 2^32) sama dengan jumlah 32 suku
+        # G[b_{i-j}] << j, jadi bisa dihitung vektor untuk seluruh blok
+        values = gear[np.concatenate((tail, data))]
+        count = len(data)
+        offset = len(tail)
+        hashes = np.zeros(count, dtype=np.uint32)
+        for shift in range(GEAR_WINDOW):
+            start = offset - shift
+            if start >= 0:
+                hashes += values[start:start + count] << np.uint32(shift)
+            elif count + start > 0:
+                hashes[-start:] += values[:count + start] << np.uint32(shift)
+        return hashes
+    
+    def _iter_chunks(self, f, gear):
+        pending = b''
+        tail = np.zeros(0, dtype=np.uint8)
+        while True:
+            block = f.read(self.read_size)
+            if not block:
+                break
+            data = np.frombuffer(block, dtype=np.uint8)
+            cuts = np.flatnonzero((self._gear_hashes(gear, tail, data) & np.uint32(self.mask)) == 0) + 1
+            tail = np.concatenate((tail, data))[-(GEAR_WINDOW - 1):]
+
+            buffer = pending + block
+            start = 0
+            for cut in (cuts + len(pending)).tolist():
+                while cut - start > self.max_chunk_size:
+                    yield buffer[start:start + self.max_chunk_size]
+                    start += self.max_chunk_size
+                if cut - start >= self.min_chunk_size:
+                    yield buffer[start:cut]
+                    start = cut
+            while len(buffer) - start > self.max_chunk_size:
+                yield buffer[start:start + self.max_chunk_size]
+                start += self.max_chunk_size
+            pending = buffer[start:]
+        if pending:
+            yield pending
+    
+    def _seal(self, backend, key, data, aad):
+        nonce = get_random_bytes(NONCE_SIZE)
+        cipher = backend.new_cipher(key, nonce)
+        cipher.update(aad)
+        ciphertext, tag = cipher.encrypt_and_digest(data)
+        return nonce + ciphertext + tag
+    
+    def _open(self, backend, key, blob, aad):
+        cipher = backend.new_cipher(key, blob[:NONCE_SIZE])
+        cipher.update(aad)
+        return cipher.decrypt_and_verify(blob[NONCE_SIZE:-TAG_SIZE], blob[-TAG_SIZE:])
+    
+    def _read_store(self, store_path):
+        # Kembalikan isi manifest.json (masih terenkripsi) atau None
+        manifest_path = os.path.join(store_path, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as f:
+            store = json.load(f)
+        if store.get('version', 0) > STORE_VERSION:
+            raise ValueError(f"Versi store ({store['version']}) tidak didukung.")
+        return store
+    
+    def _open_manifest(self, store, password):
+        # Kembalikan (backend, kunci, manifest) atau None jika password salah
+        backend = CIPHER_BACKENDS.get(store['algorithm'])
+        if backend is None or isinstance(backend, TripleDESBackend):
+            raise ValueError("Algoritma store tidak didukung.")
+        salt = base64.b64decode(store['salt'])
+        keys = self._derive_keys(password, salt, backend.key_size)
+        try:
+            manifest = self._open(backend, keys['manifest'], base64.b64decode(store['manifest']), salt)
+        except ValueError:
+            return None
+        return backend, keys, json.loads(manifest.decode('utf-8'))
+    
+    def _chunk_path(self, store_path, chunk_id):
+        return os.path.join(store_path, CHUNK_DIR, chunk_id)
+    
+    def _write_atomic(self, path, data, mode='wb'):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, mode) as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    
+    def encrypt_file(self, input_path, password, store_path=None):
+        try:
+            if not os.path.exists(input_path):
+                return False, "File tidak ditemukan!", None
+
+            if store_path is None:
+                store_path = input_path + ".store"
+
+            backend = CIPHER_BACKENDS.get(self.algorithm)
+            if backend is None or isinstance(backend, TripleDESBackend):
+                return False, f"Algoritma {self.algorithm} tidak didukung untuk mode inkremental!", None
+
+            # Store yang sudah ada hanya boleh ditimpa dengan password yang sama;
+            # chunk lama dipakai ulang jika algoritmanya juga sama
+            previous = {}
+            store = self._read_store(store_path)
+            opened = self._open_manifest(store, password) if store is not None else None
+            if store is not None and opened is None:
+                return False, "Password salah untuk store ini!", None
+            if opened is not None and store['algorithm'] == self.algorithm:
+                _, keys, manifest = opened
+                salt = base64.b64decode(store['salt'])
+                previous = {chunk_id: size for chunk_id, size in manifest['chunks']}
+            else:
+                salt = get_random_bytes(16)
+                keys = self._derive_keys(password, salt, backend.key_size)
+
+            os.makedirs(os.path.join(store_path, CHUNK_DIR), exist_ok=True)
+            gear = self._gear_table(keys['gear'])
+            chunks = []
+            written = set()
+            total_bytes = 0
+            encrypted_bytes = 0
+            reused = 0
+            with open(input_path, 'rb') as f:
+                for data in self._iter_chunks(f, gear):
+                    chunk_id = hmac.new(keys['id'], data, hashlib.sha256).hexdigest()
+                    path = self._chunk_path(store_path, chunk_id)
+                    if chunk_id in written or (
+                            previous.get(chunk_id) == len(data) and os.path.exists(path)
+                            and os.path.getsize(path) == NONCE_SIZE + len(data) + TAG_SIZE):
+                        reused += 1
+                    else:
+                        self._write_atomic(path, self._seal(backend, keys['chunk'], data, chunk_id.encode()))
+                        encrypted_bytes += len(data)
+                    written.add(chunk_id)
+                    chunks.append((chunk_id, len(data)))
+                    total_bytes += len(data)
+
+            manifest = json.dumps({
+                'original_filename': os.path.basename(input_path),
+                'original_size': total_bytes,
+                'chunks': chunks
+            }).encode('utf-8')
+            store = {
+                'version': STORE_VERSION,
+                'algorithm': self.algorithm,
+                'salt': base64.b64encode(salt).decode('utf-8'),
+                'manifest': base64.b64encode(self._seal(backend, keys['manifest'], manifest, salt)).decode('utf-8')
+            }
+            self._write_atomic(os.path.join(store_path, MANIFEST_NAME), json.dumps(store), 'w')
+
+            # Hapus chunk yang tidak lagi dirujuk manifest
+            removed = 0
+            for name in os.listdir(os.path.join(store_path, CHUNK_DIR)):
+                if name not in written:
+                    os.remove(self._chunk_path(store_path, name))
+                    removed += 1
+
+            self.last_stats = {
+                'chunks': len(chunks),
+                'reused_chunks': reused,
+                'total_bytes': total_bytes,
+                'encrypted_bytes': encrypted_bytes,
+                'removed_chunks': removed
+            }
+            return True, (f"Enkripsi inkremental berhasil! {self._format_size(encrypted_bytes)} dari "
+                          f"{self._format_size(total_bytes)} dienkripsi ulang "
+                          f"({len(chunks) - reused} dari {len(chunks)} chunk)"), store_path
+
+        except Exception as e:
+            return False, f"Error: {str(e)}", None
+    
+    def decrypt_file(self, store_path, password, output_path=None):
+        try:
+            store = self._read_store(store_path)
+            if store is None:
+                return False, "Store tidak ditemukan!", None
+
+            opened = self._open_manifest(store, password)
+            if opened is None:
+                return False, "Dekripsi gagal! Password salah atau manifest rusak.", None
+            backend, keys, manifest = opened
+
+            if output_path is None:
+                output_path = manifest['original_filename']
+
+            try:
+                with open(output_path, 'wb') as dst:
+                    for index, (chunk_id, size) in enumerate(manifest['chunks']):
+                        with open(self._chunk_path(store_path, chunk_id), 'rb') as f:
+                            blob = f.read()
+                        try:
+                            data = self._open(backend, keys['chunk'], blob, chunk_id.encode())
+                        except ValueError:
+                            raise ValueError(f"File rusak pada chunk ke-{index + 1}.")
+                        if len(data) != size:
+                            raise ValueError(f"File rusak pada chunk ke-{index + 1}.")
+                        dst.write(data)
+            except (OSError, ValueError) as e:
+                os.remove(output_path)
+                return False, f"Dekripsi gagal! {str(e)}", None
+
+            file_size = os.path.getsize(output_path)
+            return True, f"Dekripsi berhasil! Ukuran: {self._format_size(file_size)}", output_path
+
+        except Exception as e:
+            return False, f"Error: {str(e)}", None
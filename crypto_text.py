@@ -1,32 +1,164 @@
 from Crypto.Cipher import AES
 from Crypto.Random import get_random_bytes
+from Crypto.Util.Padding import unpad
 import base64
+import codecs
 import hashlib
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+_CASED_CODES = None
+
+
+def _cased_codes():
+    # Semua code point yang isupper()/islower() (sekitar 4.400 huruf), dihitung sekali
+    global _CASED_CODES
+    if _CASED_CODES is None:
+        _CASED_CODES = [code for code in range(sys.maxunicode + 1)
+                        if chr(code).isupper() or chr(code).islower()]
+    return _CASED_CODES
+
+
+# Envelope biner: versi (1 byte), id algoritma (1 byte), shift (1 byte), IV, ciphertext
+ENVELOPE_VERSION = 1
+ENVELOPE_HEADER = '>BBB'
+ENVELOPE_HEADER_SIZE = struct.calcsize(ENVELOPE_HEADER)
+ALG_CAESAR_AES192_CBC = 1
+ALG_AES192_CBC = 2
+ALG_CAESAR_AES192_GCM = 3
+ALG_AES192_GCM = 4
+ENVELOPE_ALGORITHMS = {
+    ALG_CAESAR_AES192_CBC: 'Caesar Cipher + AES-192 CBC',
+    ALG_AES192_CBC: 'AES-192 CBC',
+    ALG_CAESAR_AES192_GCM: 'Caesar Cipher + AES-192 GCM',
+    ALG_AES192_GCM: 'AES-192 GCM'
+}
+ENVELOPE_IV_SIZES = {
+    ALG_CAESAR_AES192_CBC: 16,
+    ALG_AES192_CBC: 16,
+    ALG_CAESAR_AES192_GCM: 12,
+    ALG_AES192_GCM: 12
+}
+GCM_ALGORITHMS = (ALG_CAESAR_AES192_GCM, ALG_AES192_GCM)
+GCM_TAG_SIZE = 16
+
+# Mode AES yang bisa dipilih di SuperEncryption/AESEncryption
+TEXT_MODES = ('CBC', 'GCM')
+SUPER_ALGORITHM_IDS = {'CBC': ALG_CAESAR_AES192_CBC, 'GCM': ALG_CAESAR_AES192_GCM}
+AES_ALGORITHM_IDS = {'CBC': ALG_AES192_CBC, 'GCM': ALG_AES192_GCM}
+
+
+def _envelope_header(algorithm_id, shift) -> bytes:
+    return struct.pack(ENVELOPE_HEADER, ENVELOPE_VERSION, algorithm_id, shift % 26)
+
+
+def pack_envelope(algorithm_id, shift, iv, ciphertext) -> bytes:
+    if len(iv) != ENVELOPE_IV_SIZES[algorithm_id]:
+        raise ValueError("Panjang IV tidak sesuai algoritma.")
+    return _envelope_header(algorithm_id, shift) + iv + ciphertext
+
+
+def unpack_envelope(envelope: bytes) -> dict:
+    if len(envelope) < ENVELOPE_HEADER_SIZE:
+        raise ValueError("Envelope tidak valid.")
+    version, algorithm_id, shift = struct.unpack_from(ENVELOPE_HEADER, envelope)
+    if version != ENVELOPE_VERSION:
+        raise ValueError(f"Versi envelope ({version}) tidak didukung.")
+    if algorithm_id not in ENVELOPE_ALGORITHMS:
+        raise ValueError(f"Algoritma envelope ({algorithm_id}) tidak didukung.")
+    header_size = ENVELOPE_HEADER_SIZE
+    iv_end = header_size + ENVELOPE_IV_SIZES[algorithm_id]
+    if algorithm_id in GCM_ALGORITHMS:
+        invalid = len(envelope) < iv_end + GCM_TAG_SIZE
+    else:
+        invalid = len(envelope) < iv_end or (len(envelope) - iv_end) % 16
+    if invalid:
+        raise ValueError("Envelope tidak valid.")
+    return {
+        'version': version,
+        'algorithm_id': algorithm_id,
+        'algorithm': ENVELOPE_ALGORITHMS[algorithm_id],
+        'shift': shift,
+        'iv': envelope[header_size:iv_end],
+        'ciphertext': envelope[iv_end:]
+    }
+
+
+def envelope_to_base64(envelope: bytes) -> str:
+    # Base64 hanya di tepi (form/teks); penyimpanan dan transfer cukup bytes
+    return base64.b64encode(envelope).decode("utf-8")
+
+
+def envelope_from_base64(text: str) -> bytes:
+    return base64.b64decode(text)
+
+
+def _is_envelope(raw: bytes) -> bool:
+    # Format lama (IV + ciphertext CBC) selalu kelipatan 16 byte, envelope CBC
+    # tidak; envelope GCM bisa kelipatan 16 sehingga dikenali dari id algoritma
+    if not raw or raw[0] != ENVELOPE_VERSION:
+        return False
+    return len(raw) % 16 != 0 or (len(raw) > 1 and raw[1] in GCM_ALGORITHMS)
+
+
+def _seal_envelope(algorithm_id, shift, teks, kunci) -> bytes:
+    if algorithm_id in GCM_ALGORITHMS:
+        # Header envelope ikut diautentikasi (AAD) sehingga shift/algoritma tidak bisa diubah
+        header = _envelope_header(algorithm_id, shift)
+        return header + aes192_gcm_enkripsi_kunci(teks, kunci, header)
+    iv_ct = aes192_enkripsi_kunci(teks, kunci)
+    return pack_envelope(algorithm_id, shift, iv_ct[:16], iv_ct[16:])
+
+
+def _open_envelope(envelope, info, kunci) -> str:
+    if info['algorithm_id'] in GCM_ALGORITHMS:
+        return aes192_gcm_dekripsi_kunci(info['iv'] + info['ciphertext'], kunci, envelope[:ENVELOPE_HEADER_SIZE])
+    return aes192_dekripsi_kunci(info['iv'] + info['ciphertext'], kunci)
+
+
+def _iter_text(source, read_size):
+    # source: str, file-like dengan read(), atau iterator str
+    if isinstance(source, str):
+        yield source
+    elif hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(read_size), ''):
+            yield chunk
+    else:
+        yield from source
+
 
 class CaesarCipher:
+    # Cache tabel per shift (mod 26); str.translate memproses teks dalam satu pass
+    _tables = {}
+    
+    @staticmethod
+    def table(shift):
+        shift %= 26
+        table = CaesarCipher._tables.get(shift)
+        if table is None:
+            # Hanya huruf yang dipetakan (aturan sama dengan loop per karakter
+            # sebelumnya, termasuk huruf non-ASCII); karakter lain tidak ada di
+            # tabel sehingga dibiarkan str.translate dan ukuran cache tetap kecil
+            table = {}
+            for code in _cased_codes():
+                if chr(code).isupper():
+                    table[code] = chr((code + shift - 65) % 26 + 65)
+                else:
+                    table[code] = chr((code + shift - 97) % 26 + 97)
+            table = CaesarCipher._tables.setdefault(shift, table)
+        return table
+    
     @staticmethod
     def encrypt(plaintext, shift):
-        result = ""
-        for char in plaintext:
-            if char.isupper():
-                result += chr((ord(char) + shift - 65) % 26 + 65)
-            elif char.islower():
-                result += chr((ord(char) + shift - 97) % 26 + 97)
-            else:
-                result += char
-        return result
+        return plaintext.translate(CaesarCipher.table(shift))
     
     @staticmethod
     def decrypt(ciphertext, shift):
-        result = ""
-        for char in ciphertext:
-            if char.isupper():
-                result += chr((ord(char) - shift - 65) % 26 + 65)
-            elif char.islower():
-                result += chr((ord(char) - shift - 97) % 26 + 97)
-            else:
-                result += char
-        return result
+        return ciphertext.translate(CaesarCipher.table(-shift))
 
 
 def buat_kunci_aes(bahan_kunci: str) -> bytes:
@@ -49,7 +181,11 @@ def hapus_padding(data: bytes) -> bytes:
 
 def aes192_enkripsi(teks: str, bahan_kunci: str) -> bytes:
     #Enkripsi teks dengan AES-192 CBC mode
-    kunci = buat_kunci_aes(bahan_kunci)
+    return aes192_enkripsi_kunci(teks, buat_kunci_aes(bahan_kunci))
+
+
+def aes192_enkripsi_kunci(teks: str, kunci: bytes) -> bytes:
+    #Enkripsi AES-192 CBC dengan kunci yang sudah diturunkan
     iv = get_random_bytes(16)
     cipher = AES.new(kunci, AES.MODE_CBC, iv)
     data = tambah_padding(teks.encode("utf-8"))
@@ -59,8 +195,11 @@ def aes192_enkripsi(teks: str, bahan_kunci: str) -> bytes:
 
 def aes192_dekripsi(iv_ct: bytes, bahan_kunci: str) -> str:
     #Dekripsi ciphertext AES-192 CBC
-    kunci = buat_kunci_aes(bahan_kunci)
+    return aes192_dekripsi_kunci(iv_ct, buat_kunci_aes(bahan_kunci))
+
 
+def aes192_dekripsi_kunci(iv_ct: bytes, kunci: bytes) -> str:
+    #Dekripsi AES-192 CBC dengan kunci yang sudah diturunkan
     iv = iv_ct[:16]
     ct = iv_ct[16:]
 
@@ -71,16 +210,54 @@ def aes192_dekripsi(iv_ct: bytes, bahan_kunci: str) -> str:
     return pt.decode("utf-8")
 
 
+def aes192_gcm_enkripsi_kunci(teks: str, kunci: bytes, aad: bytes = b'') -> bytes:
+    #Enkripsi + autentikasi AES-192 GCM dalam satu pass (nonce + ciphertext + tag)
+    nonce = get_random_bytes(12)
+    cipher = AES.new(kunci, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    ct, tag = cipher.encrypt_and_digest(teks.encode("utf-8"))
+    return nonce + ct + tag
+
+
+def aes192_gcm_dekripsi_kunci(nonce_ct_tag: bytes, kunci: bytes, aad: bytes = b'') -> str:
+    #Tag diverifikasi dulu; passphrase salah/data rusak ditolak tanpa menghasilkan plaintext
+    cipher = AES.new(kunci, AES.MODE_GCM, nonce=nonce_ct_tag[:12])
+    cipher.update(aad)
+    try:
+        pt = cipher.decrypt_and_verify(nonce_ct_tag[12:-GCM_TAG_SIZE], nonce_ct_tag[-GCM_TAG_SIZE:])
+    except ValueError:
+        raise ValueError("Passphrase salah atau ciphertext rusak (tag GCM tidak valid).")
+    return pt.decode("utf-8")
+
+
 class SuperEncryption:
-    def __init__(self, shift=3):
+    def __init__(self, shift=3, mode='CBC'):
+        if mode not in TEXT_MODES:
+            raise ValueError(f"Mode {mode} tidak didukung!")
         self.shift = shift
+        self.mode = mode
+        self.last_batch_stats = None
     
     def encrypt(self, plaintext, password):
+        return self._encrypt_with_key(plaintext, buat_kunci_aes(password))
+    
+    def _encrypt_with_key(self, plaintext, kunci):
+        if self.mode == 'GCM':
+            # Mode GCM selalu memakai envelope agar mode tercatat di ciphertext
+            envelope = self._encrypt_envelope_with_key(plaintext, kunci)
+            nonce = envelope[ENVELOPE_HEADER_SIZE:ENVELOPE_HEADER_SIZE + 12]
+            return {
+                'ciphertext': envelope_to_base64(envelope),
+                'iv': base64.b64encode(nonce).decode('utf-8'),
+                'shift': self.shift,
+                'algorithm': ENVELOPE_ALGORITHMS[ALG_CAESAR_AES192_GCM]
+            }
+        
         # Step 1: Caesar Cipher (Klasik)
         caesar_result = CaesarCipher.encrypt(plaintext, self.shift)
         
         # Step 2: AES-192 CBC (Modern)
-        iv_ct = aes192_enkripsi(caesar_result, password)
+        iv_ct = aes192_enkripsi_kunci(caesar_result, kunci)
         
         # Step 3: Encode ke Base64 untuk output
         ciphertext_b64 = base64.b64encode(iv_ct).decode("utf-8")
@@ -93,15 +270,188 @@ class SuperEncryption:
         }
     
     def decrypt(self, ciphertext, password):
+        return self._decrypt_with_key(ciphertext, buat_kunci_aes(password))
+    
+    def encrypt_envelope(self, plaintext, password) -> bytes:
+        # Sama seperti encrypt() tetapi hasilnya envelope biner ringkas
+        return self._encrypt_envelope_with_key(plaintext, buat_kunci_aes(password))
+    
+    def _encrypt_envelope_with_key(self, plaintext, kunci):
+        caesar_result = CaesarCipher.encrypt(plaintext, self.shift)
+        return _seal_envelope(SUPER_ALGORITHM_IDS[self.mode], self.shift, caesar_result, kunci)
+    
+    def decrypt_envelope(self, envelope, password):
+        return self._decrypt_envelope_with_key(envelope, buat_kunci_aes(password))
+    
+    def _decrypt_envelope_with_key(self, envelope, kunci):
+        # Shift diambil dari envelope, bukan dari self.shift
+        info = unpack_envelope(envelope)
+        if info['algorithm_id'] not in SUPER_ALGORITHM_IDS.values():
+            raise ValueError(f"Envelope {info['algorithm']} bukan hasil SuperEncryption.")
+        caesar_result = _open_envelope(envelope, info, kunci)
+        return CaesarCipher.decrypt(caesar_result, info['shift'])
+    
+    def _decrypt_with_key(self, ciphertext, kunci):
         # Step 1: Decode Base64
-        iv_ct = base64.b64decode(ciphertext)
+        return self._decrypt_raw_with_key(base64.b64decode(ciphertext), kunci)
+    
+    def _decrypt_raw_with_key(self, iv_ct, kunci):
+        if _is_envelope(iv_ct):
+            try:
+                return self._decrypt_envelope_with_key(iv_ct, kunci)
+            except ValueError as e:
+                # Ciphertext format lama bisa (sangat jarang) berawalan sama
+                # dengan envelope GCM; coba format lama dengan padding ketat
+                # agar passphrase salah tetap ditolak
+                if len(iv_ct) % 16 or len(iv_ct) < 32:
+                    raise
+                try:
+                    cipher = AES.new(kunci, AES.MODE_CBC, iv_ct[:16])
+                    caesar_result = unpad(cipher.decrypt(iv_ct[16:]), 16).decode("utf-8")
+                except ValueError:
+                    raise e
+                return CaesarCipher.decrypt(caesar_result, self.shift)
         
         # Step 2: Dekripsi AES-192
-        caesar_result = aes192_dekripsi(iv_ct, password)
+        caesar_result = aes192_dekripsi_kunci(iv_ct, kunci)
         
         # Step 3: Dekripsi Caesar Cipher
         plaintext = CaesarCipher.decrypt(caesar_result, self.shift)
         return plaintext
+    
+    def encrypt_stream(self, source, password, read_size=1024 * 1024):
+        # Versi streaming dari encrypt(): source berupa iterator str atau file
+        # teks, hasil di-yield sebagai potongan Base64 yang jika digabung sama
+        # dengan 'ciphertext' dari encrypt(). Memori tetap, tidak bergantung
+        # ukuran teks. Hanya mode CBC.
+        if self.mode != 'CBC':
+            raise ValueError("Mode streaming hanya mendukung CBC!")
+        iv = get_random_bytes(16)
+        cipher = AES.new(buat_kunci_aes(password), AES.MODE_CBC, iv)
+        pending = iv
+        rest = b''
+        for chunk in _iter_text(source, read_size):
+            data = rest + CaesarCipher.encrypt(chunk, self.shift).encode("utf-8")
+            cut = len(data) - len(data) % 16
+            rest = data[cut:]
+            pending += cipher.encrypt(data[:cut])
+            # Base64 hanya untuk kelipatan 3 byte agar potongan bisa digabung
+            cut = len(pending) - len(pending) % 3
+            if cut:
+                yield base64.b64encode(pending[:cut]).decode("utf-8")
+                pending = pending[cut:]
+        pending += cipher.encrypt(tambah_padding(rest))
+        yield base64.b64encode(pending).decode("utf-8")
+    
+    def decrypt_stream(self, source, password, read_size=1024 * 1024):
+        # Kebalikan encrypt_stream(); menerima juga ciphertext dari encrypt()
+        # dan envelope Base64 (envelope_to_base64)
+        kunci = buat_kunci_aes(password)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        cipher = None
+        envelope = False
+        encoded = ''
+        data = b''
+        for chunk in _iter_text(source, read_size):
+            encoded += ''.join(chunk.split())
+            cut = len(encoded) - len(encoded) % 4
+            data += base64.b64decode(encoded[:cut])
+            encoded = encoded[cut:]
+            if cipher is None and not envelope and len(data) >= ENVELOPE_HEADER_SIZE:
+                # Envelope (terutama GCM) harus diverifikasi utuh sebelum plaintext
+                # dikeluarkan, jadi dikumpulkan lalu didekripsi sekaligus
+                envelope = data[0] == ENVELOPE_VERSION and data[1] in ENVELOPE_ALGORITHMS
+            if envelope:
+                continue
+            if cipher is None:
+                if len(data) < 16:
+                    continue
+                cipher = AES.new(kunci, AES.MODE_CBC, data[:16])
+                data = data[16:]
+            # Blok terakhir ditahan sampai akhir karena berisi padding
+            cut = max(0, (len(data) - 1) // 16 * 16)
+            if cut:
+                text = decoder.decode(cipher.decrypt(data[:cut]))
+                data = data[cut:]
+                if text:
+                    yield CaesarCipher.decrypt(text, self.shift)
+        if encoded:
+            data += base64.b64decode(encoded)
+        if envelope or (cipher is None and _is_envelope(data)):
+            yield self._decrypt_raw_with_key(data, kunci)
+            return
+        if cipher is None and len(data) >= 16:
+            cipher = AES.new(kunci, AES.MODE_CBC, data[:16])
+            data = data[16:]
+        if cipher is None or not data or len(data) % 16:
+            raise ValueError("Ciphertext tidak lengkap.")
+        text = decoder.decode(hapus_padding(cipher.decrypt(data)), final=True)
+        if text:
+            yield CaesarCipher.decrypt(text, self.shift)
+    
+    def encrypt_many(self, plaintexts, password, workers=None, batch_size=1024, errors='raise'):
+        # Yield hasil encrypt() untuk tiap pesan, urutan sama dengan input.
+        # errors='raise': berhenti di record pertama yang gagal (hasil sebelumnya
+        # tetap di-yield); errors='return': exception di-yield di posisi record.
+        return self._run_many(self._encrypt_with_key, plaintexts, password, workers, batch_size, errors)
+    
+    def decrypt_many(self, ciphertexts, password, workers=None, batch_size=1024, errors='raise'):
+        return self._run_many(self._decrypt_with_key, ciphertexts, password, workers, batch_size, errors)
+    
+    def _run_many(self, func, items, password, workers, batch_size, errors):
+        if errors not in ('raise', 'return'):
+            raise ValueError(f"Nilai errors '{errors}' tidak didukung (raise/return).")
+        self.last_batch_stats = None
+        return self._iter_many(func, items, buat_kunci_aes(password), workers, batch_size, errors)
+    
+    def _iter_many(self, func, items, kunci, workers, batch_size, errors):
+        # Kunci diturunkan sekali; pesan dikelompokkan per batch agar overhead
+        # thread pool kecil untuk record pendek, batch yang menunggu dibatasi
+        workers = workers or os.cpu_count() or 1
+        items = iter(items)
+        count = 0
+        failed = 0
+        start = time.perf_counter()
+
+        def run_batch(batch):
+            # Error ditangkap per record agar satu record rusak tidak menggagalkan batch
+            results = []
+            for item in batch:
+                try:
+                    results.append(func(item, kunci))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        pending = deque()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    batch = [item for _, item in zip(range(batch_size), items)]
+                    if not batch:
+                        break
+                    pending.append(pool.submit(run_batch, batch))
+                if not pending:
+                    break
+                for result in pending.popleft().result():
+                    count += 1
+                    if isinstance(result, Exception):
+                        failed += 1
+                        if errors == 'raise':
+                            raise result
+                    yield result
+        finally:
+            # Batch yang belum berjalan dibatalkan jika iterasi berhenti lebih
+            # awal; hanya batch yang sedang berjalan yang ditunggu
+            pool.shutdown(wait=True, cancel_futures=True)
+            seconds = time.perf_counter() - start
+            self.last_batch_stats = {
+                'records': count,
+                'errors': failed,
+                'seconds': seconds,
+                'records_per_second': count / seconds if seconds > 0 else 0.0
+            }
 
 class AESEncryption:    
     @staticmethod
@@ -110,7 +460,16 @@ class AESEncryption:
         return buat_kunci_aes(password)
     
     @staticmethod
-    def encrypt(plaintext, password):
+    def encrypt(plaintext, password, mode='CBC'):
+        if mode not in TEXT_MODES:
+            raise ValueError(f"Mode {mode} tidak didukung!")
+        if mode == 'GCM':
+            nonce_ct_tag = aes192_gcm_enkripsi_kunci(plaintext, buat_kunci_aes(password))
+            return (
+                base64.b64encode(nonce_ct_tag[12:]).decode('utf-8'),
+                base64.b64encode(nonce_ct_tag[:12]).decode('utf-8')
+            )
+
         iv_ct = aes192_enkripsi(plaintext, password)
 
         # Split IV and ciphertext
@@ -127,9 +486,24 @@ class AESEncryption:
         ct = base64.b64decode(ciphertext_base64)
         iv = base64.b64decode(iv_base64)
 
+        # Nonce GCM 12 byte, IV CBC 16 byte
+        if len(iv) == 12:
+            return aes192_gcm_dekripsi_kunci(iv + ct, buat_kunci_aes(password))
+
         # Combine IV + ciphertext
         iv_ct = iv + ct
 
         return aes192_dekripsi(iv_ct, password)
-
-
+    
+    @staticmethod
+    def encrypt_envelope(plaintext, password, mode='CBC') -> bytes:
+        if mode not in TEXT_MODES:
+            raise ValueError(f"Mode {mode} tidak didukung!")
+        return _seal_envelope(AES_ALGORITHM_IDS[mode], 0, plaintext, buat_kunci_aes(password))
+    
+    @staticmethod
+    def decrypt_envelope(envelope, password):
+        info = unpack_envelope(envelope)
+        if info['algorithm_id'] not in AES_ALGORITHM_IDS.values():
+            raise ValueError(f"Envelope {info['algorithm']} bukan hasil AESEncryption.")
+        return _open_envelope(envelope, info, buat_kunci_aes(password))
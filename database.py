@@ -26,13 +26,14 @@ class Database:
         if value is None:
             return None
 
-        data = str(value).encode("utf-8")
+        # bytes (mis. envelope biner) dienkripsi apa adanya tanpa Base64 tambahan
+        data = value if isinstance(value, bytes) else str(value).encode("utf-8")
         iv = os.urandom(16)
         cipher = AES.new(self._encryption_key, AES.MODE_CBC, iv)
         ciphertext = cipher.encrypt(pad(data, AES.block_size))
         return base64.b64encode(iv + ciphertext).decode("utf-8")
 
-    def _decrypt_value(self, encrypted_value):
+    def _decrypt_value(self, encrypted_value, binary=False):
         if encrypted_value is None:
             return None
 
@@ -42,9 +43,22 @@ class Database:
             ciphertext = raw[16:]
             cipher = AES.new(self._encryption_key, AES.MODE_CBC, iv)
             plaintext = unpad(cipher.decrypt(ciphertext), AES.block_size)
-            return plaintext.decode("utf-8")
+            return plaintext if binary else plaintext.decode("utf-8")
         except Exception:
             return encrypted_value
+
+    def _display_value(self, value):
+        # Nilai biner (envelope) ditampilkan sebagai Base64; baris lama sudah
+        # berupa teks Base64 sehingga dikembalikan apa adanya
+        if not isinstance(value, bytes):
+            return value
+        try:
+            text = value.decode("utf-8")
+            if text.isprintable():
+                return text
+        except UnicodeDecodeError:
+            pass
+        return base64.b64encode(value).decode("utf-8")
     
     def init_database(self):
         conn = self.get_connection()
@@ -234,7 +248,7 @@ class Database:
         history = []
         for row in results:
             plaintext = self._decrypt_value(row[1])
-            ciphertext = self._decrypt_value(row[2])
+            ciphertext = self._display_value(self._decrypt_value(row[2], binary=True))
             shift_raw = self._decrypt_value(row[5])
             try:
                 shift_value = int(shift_raw) if shift_raw is not None else None
@@ -0,0 +1,252 @@
+import argparse
+import base64
+import getpass
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from Crypto.Cipher import AES
+from Crypto.Random import get_random_bytes
+
+from batch_utils import run_bounded, Throughput
+from crypto_file import TripleDESFileEncryption, FileEncryptionSession, TAG_SIZE
+
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 2
+ENCRYPTED_SUFFIX = '.encrypted'
+NONCE_SIZE = 12
+# Konteks HKDF untuk kunci turunan master key sesi
+MANIFEST_CONTEXT = b'CamoCrypt batch manifest'
+MAC_CONTEXT = b'CamoCrypt batch content MAC'
+KEY_ID_CONTEXT = b'CamoCrypt batch key id'
+
+
+def _file_mac(key, path, chunk_size=1024 * 1024):
+    # HMAC-SHA256 isi file; tanpa kunci, isi yang mudah ditebak tidak bisa dicocokkan
+    mac = hmac.new(key, digestmod=hashlib.sha256)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            mac.update(block)
+    return mac.hexdigest()
+
+
+def _safe_path(base, relative):
+    # Path dari manifest tidak boleh absolut atau keluar dari base (mis. '../x')
+    root = os.path.abspath(base)
+    path = os.path.abspath(os.path.join(root, *relative.split('/')))
+    if os.path.isabs(relative) or path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"Path tidak valid di manifest: {relative}")
+    return path
+
+
+def read_store(directory):
+    # Isi manifest.json (masih terenkripsi) atau None
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def open_store(store, password, encryption=None):
+    # Kembalikan (sesi, manifest); manifest None jika password salah atau
+    # manifest rusak. Sesi memakai master salt manifest sehingga PBKDF2
+    # hanya sekali untuk manifest dan semua file.
+    if store.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Versi manifest ({store.get('version')}) tidak didukung.")
+    session = FileEncryptionSession(password, encryption, master_salt=base64.b64decode(store['salt']))
+    blob = base64.b64decode(store['manifest'])
+    cipher = AES.new(session.derive_key(MANIFEST_CONTEXT), AES.MODE_GCM, nonce=blob[:NONCE_SIZE])
+    try:
+        data = cipher.decrypt_and_verify(blob[NONCE_SIZE:-TAG_SIZE], blob[-TAG_SIZE:])
+    except ValueError:
+        return session, None
+    return session, json.loads(data.decode('utf-8'))
+
+
+def write_store(directory, session, manifest):
+    # Manifest (path, ukuran, mtime, HMAC isi, opsi) disimpan terenkripsi AES-GCM
+    nonce = get_random_bytes(NONCE_SIZE)
+    cipher = AES.new(session.derive_key(MANIFEST_CONTEXT), AES.MODE_GCM, nonce=nonce)
+    ciphertext, tag = cipher.encrypt_and_digest(json.dumps(manifest).encode('utf-8'))
+    store = {
+        'version': MANIFEST_VERSION,
+        'salt': base64.b64encode(session.master_salt).decode('utf-8'),
+        'manifest': base64.b64encode(nonce + ciphertext + tag).decode('utf-8')
+    }
+    path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f)
+    os.replace(tmp_path, path)
+
+
+def walk_files(source_dir, exclude=None):
+    # Yield path relatif (pemisah '/') semua file di bawah source_dir
+    exclude = os.path.abspath(exclude) if exclude else None
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude)
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            yield os.path.relpath(path, source_dir).replace(os.sep, '/')
+
+
+def _run_pool(func, items, workers):
+    # Satu thread per file, hasil di-yield segera setelah selesai
+    def failed(args, e):
+        return {'path': args[0], 'status': 'failed', 'message': f"Error: {str(e)}",
+                'bytes': 0, 'seconds': 0.0}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        yield from run_bounded(pool, func, ((item,) for item in items), workers * 4, failed)
+
+
+def encrypt_directory(source_dir, output_dir, password, workers=None, algorithm=None,
+                      segmented=False, compression=None, use_hash=True, force=False):
+    # Enkripsi semua file di source_dir ke output_dir/<path relatif>.encrypted.
+    # File dilewati hanya jika opsi enkripsi sama dengan run sebelumnya dan
+    # isinya tidak berubah (ukuran + mtime, atau HMAC isi jika mtime berbeda).
+    # Manifest terenkripsi ditulis di output_dir. Password yang tidak cocok
+    # dengan manifest ditolak, kecuali force=True (semua file dienkripsi ulang).
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    encryption = TripleDESFileEncryption(workers=1)
+    previous = {}
+    session = None
+    store = read_store(output_dir)
+    if store is not None and store.get('version') == MANIFEST_VERSION:
+        session, manifest = open_store(store, password, encryption)
+        if manifest is not None:
+            previous = manifest['files']
+        elif not force:
+            raise ValueError("Password salah untuk direktori ini! Gunakan --force untuk mengenkripsi ulang.")
+        else:
+            # Ganti password (atau manifest rusak): semua file dienkripsi ulang
+            session = None
+    if session is None:
+        session = FileEncryptionSession(password, encryption)
+
+    mac_key = session.derive_key(MAC_CONTEXT)
+    options = {
+        'algorithm': algorithm or encryption.algorithm,
+        'segmented': bool(segmented),
+        'compression': compression,
+        'key_id': session.derive_key(KEY_ID_CONTEXT, 8).hex()
+    }
+    entries = {}
+
+    def process(relative):
+        start = time.perf_counter()
+        source = os.path.join(source_dir, relative)
+        target = _safe_path(output_dir, relative + ENCRYPTED_SUFFIX)
+        stat = os.stat(source)
+        mac = None
+        old = previous.get(relative)
+        if (old is not None and old.get('size') == stat.st_size and os.path.exists(target)
+                and all(old.get(name) == value for name, value in options.items())):
+            if old.get('mtime_ns') == stat.st_mtime_ns:
+                entries[relative] = old
+                return {'path': relative, 'status': 'skipped', 'message': "Tidak berubah, dilewati.",
+                        'bytes': 0, 'seconds': time.perf_counter() - start}
+            if use_hash and old.get('mac'):
+                mac = _file_mac(mac_key, source)
+                if hmac.compare_digest(mac, old['mac']):
+                    entries[relative] = dict(old, mtime_ns=stat.st_mtime_ns)
+                    return {'path': relative, 'status': 'skipped', 'message': "Isi sama (HMAC), dilewati.",
+                            'bytes': 0, 'seconds': time.perf_counter() - start}
+        entry = dict(options, size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+                     output=relative + ENCRYPTED_SUFFIX)
+        if use_hash:
+            entry['mac'] = mac or _file_mac(mac_key, source)
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        success, msg, _ = session.encrypt_file(source, target, segmented, algorithm, compression)
+        if success:
+            entries[relative] = entry
+        elif old is not None:
+            entries[relative] = old
+        return {'path': relative, 'status': 'encrypted' if success else 'failed', 'message': msg,
+                'bytes': stat.st_size, 'seconds': time.perf_counter() - start}
+
+    try:
+        yield from _run_pool(process, walk_files(source_dir, exclude=output_dir), workers)
+    finally:
+        write_store(output_dir, session, {'files': entries})
+
+
+def decrypt_directory(encrypted_dir, output_dir, password, workers=None):
+    # Kembalikan struktur direktori asli berdasarkan manifest
+    workers = workers or os.cpu_count() or 1
+    store = read_store(encrypted_dir)
+    if store is None:
+        raise ValueError("Manifest tidak ditemukan!")
+    session, manifest = open_store(store, password, TripleDESFileEncryption(workers=1))
+    if manifest is None:
+        raise ValueError("Password salah atau manifest rusak!")
+    files = manifest['files']
+
+    def process(relative):
+        start = time.perf_counter()
+        source = _safe_path(encrypted_dir, files[relative]['output'])
+        target = _safe_path(output_dir, relative)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        success, msg, _ = session.decrypt_file(source, target)
+        return {'path': relative, 'status': 'decrypted' if success else 'failed', 'message': msg,
+                'bytes': files[relative]['size'] if success else 0,
+                'seconds': time.perf_counter() - start}
+
+    yield from _run_pool(process, sorted(files), workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Enkripsi/dekripsi seluruh direktori (struktur folder dipertahankan)."
+    )
+    parser.add_argument('mode', choices=['encrypt', 'decrypt'], help="encrypt atau decrypt")
+    parser.add_argument('source', help="Direktori sumber")
+    parser.add_argument('output', help="Direktori tujuan")
+    parser.add_argument('-p', '--password', default=None, help="Password (default: ditanyakan)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Jumlah thread worker (default: jumlah CPU)")
+    parser.add_argument('-a', '--algorithm', default=None, help="Algoritma: 3DES-192, AES-256-GCM, ChaCha20-Poly1305")
+    parser.add_argument('-c', '--compression', default=None, help="Kompresi: zlib, lzma, bz2, auto")
+    parser.add_argument('--segmented', action='store_true', help="Gunakan mode segmented")
+    parser.add_argument('--no-hash', action='store_true', help="Jangan hitung HMAC isi (deteksi perubahan hanya dari ukuran/mtime)")
+    parser.add_argument('--force', action='store_true', help="Enkripsi ulang semua file meskipun password tidak cocok dengan manifest")
+    args = parser.parse_args(argv)
+
+    password = args.password or getpass.getpass("Password: ")
+    if args.mode == 'encrypt':
+        results = encrypt_directory(args.source, args.output, password, args.workers, args.algorithm,
+                                    args.segmented, args.compression, not args.no_hash, args.force)
+    else:
+        results = decrypt_directory(args.source, args.output, password, args.workers)
+
+    stats = Throughput('file')
+    skipped = 0
+    try:
+        for result in results:
+            stats.add(result['bytes'], result['status'] != 'failed')
+            if result['status'] == 'failed':
+                status = "GAGAL"
+            elif result['status'] == 'skipped':
+                skipped += 1
+                status = "LEWAT"
+            else:
+                status = "OK"
+            print(f"[{status}] {result['path']}: {result['message']} ({result['seconds']:.2f}s) "
+                  f"| {stats.rate()}", flush=True)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return 1
+
+    print(stats.summary(f" ({skipped} dilewati)"))
+    return 1 if stats.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
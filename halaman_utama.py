@@ -1,8 +1,8 @@
 import streamlit as st
 from database import Database
-from crypto_text import SuperEncryption
+from crypto_text import SuperEncryption, envelope_to_base64, unpack_envelope, TEXT_MODES
 from crypto_image import ImageSteganography
-from crypto_file import TripleDESFileEncryption
+from crypto_file import TripleDESFileEncryption, CIPHER_BACKENDS
 import tempfile
 import os
 
@@ -135,30 +135,33 @@ def show_text_encryption():
             shift = st.slider("Caesar Cipher Shift:", 1, 25, 5)
         with col2:
             password = st.text_input("Passphrase AES:", type="password", placeholder="Passphrase untuk enkripsi")
+        mode = st.selectbox("Mode AES:", list(TEXT_MODES), help="GCM: terautentikasi, passphrase salah langsung ditolak")
         
         if st.button("🔒 Enkripsi", type="primary", use_container_width=True):
             if plaintext and password:
                 try:
-                    crypto = SuperEncryption(shift=shift)
-                    result = crypto.encrypt(plaintext, password)
+                    crypto = SuperEncryption(shift=shift, mode=mode)
+                    # Envelope biner (IV dan shift di dalamnya), Base64 hanya untuk tampilan/DB
+                    envelope = crypto.encrypt_envelope(plaintext, password)
+                    ciphertext_b64 = envelope_to_base64(envelope)
                     
                     st.success("✅ Enkripsi berhasil!")
                     
-                    st.text_area("Ciphertext:", value=result['ciphertext'], height=100)
+                    st.text_area("Ciphertext:", value=ciphertext_b64, height=100)
 
                     db = Database()
                     db.save_text_encryption(
                         st.session_state.user_id,
                         plaintext,
-                        result['ciphertext'],
-                        result['algorithm'],
-                        result['iv'],
-                        result['shift']
+                        envelope,
+                        unpack_envelope(envelope)['algorithm'],
+                        None,
+                        shift
                     )
                     txt_content = (
                         f"Shift: {shift}\n"
                         f"Password: {password}\n"
-                        f"Ciphertext: {result['ciphertext']}\n"
+                        f"Ciphertext: {ciphertext_b64}\n"
                     )
 
                     st.download_button(
@@ -252,13 +255,15 @@ def show_steganography():
                     tmp_path = tmp.name
                 
                 stego = ImageSteganography()
-                max_chars, width, height, total_pixels = stego.calculate_capacity(tmp_path)
+                lsb_chars, width, height, total_pixels = stego.calculate_capacity(tmp_path)
+                max_chars, _, _, _ = stego.calculate_capacity(tmp_path, bits_per_channel=4)
                 
                 st.info(f"""
                     📊 **Informasi Gambar:**
                     - Ukuran: {width} x {height} px
                     - Total pixels: {total_pixels:,}
-                    - Kapasitas pesan: ~{max_chars:,} karakter
+                    - Kapasitas pesan: ~{lsb_chars:,} karakter (1 bit/channel)
+                    - Kapasitas maksimal: ~{max_chars:,} karakter (4 bit/channel)
                 """)
             
             with col2:
@@ -381,6 +386,11 @@ def show_file_encryption():
                     placeholder="Masukkan password",
                     key="pass_enc"
                 )
+                algorithm_enc = st.selectbox(
+                    "Algoritma:",
+                    list(CIPHER_BACKENDS),
+                    key="alg_enc"
+                )
                 
                 if st.button("🔒 Enkripsi File", type="primary", use_container_width=True):
                     if password_enc:
@@ -392,7 +402,8 @@ def show_file_encryption():
                             des3 = TripleDESFileEncryption()
                             success, msg, output_path = des3.encrypt_file(
                                 tmp_path,
-                                password_enc
+                                password_enc,
+                                algorithm=algorithm_enc
                             )
                             
                             if success and output_path:
@@ -405,7 +416,7 @@ def show_file_encryption():
                                     st.session_state.user_id,
                                     uploaded_file.name,
                                     uploaded_file.name + ".encrypted",
-                                    "3DES-192",
+                                    algorithm_enc,
                                     len(encrypted_data)
                                 )
                                 
@@ -413,7 +424,7 @@ def show_file_encryption():
                                     label="💾 Download File Terenkripsi",
                                     data=encrypted_data,
                                     file_name=f"{uploaded_file.name}.encrypted",
-                                    mime="application/json",
+                                    mime="application/octet-stream",
                                     use_container_width=True
                                 )
                                 
@@ -457,8 +468,8 @@ def show_file_encryption():
                 if st.button("🔓 Dekripsi File", type="primary", use_container_width=True):
                     if password_dec:
                         try:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix='.encrypted', mode='w') as tmp:
-                                tmp.write(uploaded_encrypted.getvalue().decode('utf-8'))
+                            with tempfile.NamedTemporaryFile(delete=False, suffix='.encrypted') as tmp:
+                                tmp.write(uploaded_encrypted.getvalue())
                                 tmp_path = tmp.name
                             
                             des3 = TripleDESFileEncryption()
@@ -518,7 +529,10 @@ def show_history():
                     with col1:
                         st.info(f"🔄 Shift: {item['shift']}")
                     with col2:
-                        st.info(f"🔑 IV: {item['iv'][:20]}...")
+                        if item['iv']:
+                            st.info(f"🔑 IV: {item['iv'][:20]}...")
+                        else:
+                            st.info("🔑 IV: tersimpan di dalam envelope")
         else:
             st.info("Belum ada riwayat enkripsi text.")
     
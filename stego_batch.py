@@ -0,0 +1,99 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from batch_utils import run_bounded, Throughput
+from crypto_image import ImageSteganography
+
+
+# Satu instance ImageSteganography per proses worker
+_stego = None
+
+
+def _init_worker(tile_bytes):
+    global _stego
+    _stego = ImageSteganography(tile_bytes=tile_bytes)
+
+
+def _embed_item(index, item, bits_per_channel):
+    start = time.perf_counter()
+    try:
+        size = os.path.getsize(item['image_path'])
+    except OSError:
+        size = 0
+    success, msg = _stego.embed_message(
+        item['image_path'], item['message'], item['output_path'], bits_per_channel
+    )
+    return {
+        'index': index,
+        'image_path': item['image_path'],
+        'output_path': item['output_path'],
+        'success': success,
+        'message': msg,
+        'bytes': size,
+        'seconds': time.perf_counter() - start
+    }
+
+
+def read_manifest(manifest_path):
+    # Manifest CSV (header: image_path,message,output_path) atau JSON Lines
+    with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+        if manifest_path.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                yield row
+
+
+def embed_batch(items, workers=None, bits_per_channel=None, tile_bytes=8 * 1024 * 1024):
+    # Jalankan embed_message untuk tiap item di process pool. Hasil di-yield
+    # segera setelah selesai (urutan selesai, lihat 'index' untuk urutan input).
+    workers = workers or os.cpu_count() or 1
+
+    def failed(args, e):
+        index, item, _ = args
+        return {
+            'index': index,
+            'image_path': item.get('image_path'),
+            'output_path': item.get('output_path'),
+            'success': False,
+            'message': f"Error: {str(e)}",
+            'bytes': 0,
+            'seconds': 0.0
+        }
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(tile_bytes,)) as pool:
+        # Batasi jumlah item yang menunggu agar manifest besar tidak dimuat sekaligus
+        jobs = ((index, item, bits_per_channel) for index, item in enumerate(items))
+        yield from run_bounded(pool, _embed_item, jobs, workers * 4, failed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Sembunyikan pesan ke banyak gambar sekaligus (LSB steganografi)."
+    )
+    parser.add_argument('manifest', help="File manifest .csv (image_path,message,output_path) atau .jsonl")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU)")
+    parser.add_argument('-k', '--bits-per-channel', type=int, default=None, help="Bit per channel 1-4 (default: otomatis)")
+    args = parser.parse_args(argv)
+
+    stats = Throughput('gambar')
+    for result in embed_batch(read_manifest(args.manifest), args.workers, args.bits_per_channel):
+        stats.add(result['bytes'], result['success'])
+        status = "OK" if result['success'] else "GAGAL"
+        print(f"[{status}] #{result['index']} {result['image_path']} -> {result['output_path']}: "
+              f"{result['message']} ({result['seconds']:.2f}s)", flush=True)
+
+    print(stats.summary())
+    return 1 if stats.failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())